@@ -0,0 +1,287 @@
+"""
+Otto Voice Agent - Local GitHub Activity Store
+SQLite copy of each user's recent GitHub activity, kept current by incremental
+syncs and webhook deliveries, so get_github_activity is an indexed query
+instead of a fan-out over every repo.
+"""
+
+import os
+import hmac
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger("otto.activity")
+
+ACTIVITY_DB_PATH = os.getenv(
+    "ACTIVITY_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "otto_activity.db"),
+)
+# Seconds a query waits on another process's write lock before failing
+ACTIVITY_DB_TIMEOUT = float(os.getenv("ACTIVITY_DB_TIMEOUT", "0.5"))
+
+# Webhook ingest endpoint, shared with the Next.js webhook route: it posts to
+# ACTIVITY_INGEST_URL (e.g. http://127.0.0.1:8765/ingest/github) and the agent
+# listens on that URL's port (disabled if unset). ACTIVITY_INGEST_HOST is the
+# bind address; it only goes beyond loopback when a shared secret is configured.
+ACTIVITY_INGEST_URL = os.getenv("ACTIVITY_INGEST_URL")
+ACTIVITY_INGEST_PORT = (urlparse(ACTIVITY_INGEST_URL).port or 0) if ACTIVITY_INGEST_URL else 0
+ACTIVITY_INGEST_HOST = os.getenv("ACTIVITY_INGEST_HOST", "127.0.0.1")
+ACTIVITY_INGEST_SECRET = os.getenv("ACTIVITY_INGEST_SECRET")
+# Largest delivery accepted (a push carries at most a few hundred commits)
+MAX_INGEST_BYTES = 1024 * 1024
+
+# Rows older than this are pruned (at most once per PRUNE_INTERVAL)
+ACTIVITY_RETENTION_DAYS = float(os.getenv("ACTIVITY_RETENTION_DAYS", "30"))
+PRUNE_INTERVAL = 3600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity (
+    id TEXT PRIMARY KEY,
+    repo TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    actor TEXT,
+    title TEXT,
+    state TEXT,
+    occurred_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS activity_repo_time ON activity (repo, occurred_at DESC);
+CREATE INDEX IF NOT EXISTS activity_time ON activity (occurred_at DESC);
+
+CREATE TABLE IF NOT EXISTS user_repos (
+    user_id TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (user_id, repo)
+);
+CREATE INDEX IF NOT EXISTS user_repos_name ON user_repos (user_id, name);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    user_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    covered_from REAL NOT NULL,
+    PRIMARY KEY (user_id, scope)
+);
+"""
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """ISO 8601 (GitHub's "Z" or an offset) -> epoch seconds"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class ActivityStore:
+    """
+    activity: one row per commit/PR, keyed by the ids the API and webhook share.
+    user_repos: which repos belong to which user (learned from syncs).
+    sync_state: per user and scope ("" or a repo name), when it was last synced
+    and how far back the stored rows are complete.
+    """
+
+    def __init__(self, path: str = ACTIVITY_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=ACTIVITY_DB_TIMEOUT, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets job processes read while the ingest thread writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._pruned_at = 0.0
+
+    def upsert_events(self, events: list[dict], user_id: Optional[str] = None) -> int:
+        """Insert or update events; with a user_id, also link their repos to that user"""
+        rows = []
+        repos = set()
+        for event in events:
+            occurred_at = parse_timestamp(event.get("date"))
+            if not event.get("id") or not event.get("repo") or occurred_at is None:
+                continue
+            repos.add(event["repo"])
+            rows.append((
+                event["id"], event["repo"], event.get("event_type", "unknown"),
+                event.get("actor"), event.get("title"), event.get("state"), occurred_at,
+            ))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO activity (id, repo, event_type, actor, title, state, occurred_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET title = excluded.title, state = excluded.state",
+                    rows,
+                )
+                if user_id:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO user_repos (user_id, repo, name) VALUES (?, ?, ?)",
+                        [(user_id, repo, repo.split("/")[-1].lower()) for repo in repos],
+                    )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        if time.time() - self._pruned_at > PRUNE_INTERVAL:
+            self.prune()
+        return len(rows)
+
+    def prune(self, retention_days: float = ACTIVITY_RETENTION_DAYS) -> int:
+        """Delete activity older than the retention window; returns rows removed"""
+        now = time.time()
+        cutoff = now - retention_days * 86400
+        with self._lock:
+            self._pruned_at = now
+            self._conn.execute("BEGIN")
+            try:
+                removed = self._conn.execute("DELETE FROM activity WHERE occurred_at < ?", (cutoff,)).rowcount
+                # Rows before the cutoff are gone, so no scope is complete that far back
+                self._conn.execute(
+                    "UPDATE sync_state SET covered_from = ? WHERE covered_from < ?", (cutoff, cutoff)
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        if removed:
+            logger.info(f"Pruned {removed} GitHub events older than {retention_days:g} days")
+        return removed
+
+    def sync_state(self, user_id: str, scope: str) -> Optional[tuple[float, float]]:
+        """(synced_at, covered_from) for a user's scope, or None if never synced"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at, covered_from FROM sync_state WHERE user_id = ? AND scope = ?",
+                (user_id, scope),
+            ).fetchone()
+        return (row["synced_at"], row["covered_from"]) if row else None
+
+    def record_sync(self, user_id: str, scope: str, synced_at: float, covered_from: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sync_state (user_id, scope, synced_at, covered_from) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(user_id, scope) DO UPDATE SET synced_at = excluded.synced_at, "
+                "covered_from = MIN(sync_state.covered_from, excluded.covered_from)",
+                (user_id, scope, synced_at, covered_from),
+            )
+
+    def recent_events(
+        self,
+        user_id: str,
+        since: float,
+        repo_name: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """A user's activity since `since` (epoch seconds), newest first"""
+        query = (
+            "SELECT a.id, a.event_type, a.actor, a.title, a.state, a.repo, a.occurred_at "
+            "FROM user_repos u JOIN activity a ON a.repo = u.repo "
+            "WHERE u.user_id = ? AND a.occurred_at >= ?"
+        )
+        params: list = [user_id, since]
+        if repo_name:
+            name = repo_name.strip().lower()
+            query += " AND (u.name = ? OR lower(u.repo) = ?)"
+            params += [name.split("/")[-1], name]
+        query += " ORDER BY a.occurred_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[ActivityStore] = None
+_store_lock = threading.Lock()
+
+# Store calls block on disk and on other processes' locks - keep them off the event loop
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="otto-activity")
+
+
+def get_activity_store() -> ActivityStore:
+    """The process-wide store (the database file is shared across job processes)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ActivityStore()
+        return _store
+
+
+async def run_in_store_thread(fn: Callable[..., Any], *args) -> Any:
+    """Await a blocking store call (or get_activity_store itself) on the store's pool"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+class _IngestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/ingest/github":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if ACTIVITY_INGEST_SECRET and not hmac.compare_digest(
+            self.headers.get("X-Agent-Secret", "").encode("utf-8"),
+            ACTIVITY_INGEST_SECRET.encode("utf-8"),
+        ):
+            self.send_response(401)
+            self.end_headers()
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_INGEST_BYTES:
+            self.send_response(413 if length > MAX_INGEST_BYTES else 400)
+            self.end_headers()
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            stored = get_activity_store().upsert_events(payload.get("events", []))
+        except (ValueError, sqlite3.Error) as e:
+            logger.warning(f"Rejected activity delivery: {e}")
+            self.send_response(400)
+            self.end_headers()
+            return
+        logger.info(f"Ingested {stored} GitHub events for {payload.get('repo')}")
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_ingest_server(port: int = ACTIVITY_INGEST_PORT, host: str = ACTIVITY_INGEST_HOST) -> None:
+    """Accept webhook deliveries on POST /ingest/github from a daemon thread (once per process)"""
+    global _server
+    if _server is not None or not port:
+        return
+    if host not in ("127.0.0.1", "localhost", "::1") and not ACTIVITY_INGEST_SECRET:
+        logger.error(f"Activity ingest not started: listening on {host} requires ACTIVITY_INGEST_SECRET")
+        return
+    try:
+        _server = ThreadingHTTPServer((host, port), _IngestHandler)
+    except OSError as e:
+        # Another job process already owns the port; it writes to the same database
+        logger.info(f"Activity ingest not started on port {port}: {e}")
+        return
+    threading.Thread(target=_server.serve_forever, name="otto-activity-ingest", daemon=True).start()
+    logger.info(f"Activity ingest listening on {host}:{port}/ingest/github")
@@ -0,0 +1,87 @@
+"""
+Otto Date Parsing Microbenchmark
+Per-call cost of date_parsing.parse_date/parse_time, cold (memo cleared) vs
+warm (memoized), against the strptime loop create_calendar_event used before.
+
+Run with: python benchmark_date_parsing.py --number 20000
+"""
+
+import os
+import sys
+import timeit
+import argparse
+from datetime import datetime
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from date_parsing import parse_date, parse_time, clear_caches
+
+DATE_PHRASES = ["tomorrow", "friday", "January 28th", "Feb 15", "2026-03-04", "next week", "Aug. 3rd"]
+TIME_PHRASES = ["3pm", "3:30pm", "15:00", "9:15am"]
+
+_LEGACY_DATE_FORMATS = [
+    "%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y",
+    "%B %d", "%B %dth", "%B %dst", "%B %dnd", "%B %drd",
+    "%b %d", "%b %dth", "%b %dst", "%b %dnd", "%b %drd",
+    "%b. %d", "%b. %dth",
+]
+
+
+def legacy_parse_date(date: str) -> str:
+    """The original strptime loop (format list rebuilt per call, up to 30 attempts)"""
+    date_formats = list(_LEGACY_DATE_FORMATS)
+    clean_date = date.lower().strip().replace("st", "").replace("nd", "").replace("rd", "").replace("th", "").strip()
+    for fmt in date_formats:
+        for try_date in [date, clean_date]:
+            try:
+                return datetime.strptime(try_date, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+    return date
+
+
+def legacy_parse_time(time: str) -> str:
+    time_lower = time.lower().strip().replace(" ", "")
+    for fmt in ["%I%p", "%I:%M%p", "%I:00%p"]:
+        try:
+            return datetime.strptime(time_lower, fmt).strftime("%H:%M")
+        except ValueError:
+            continue
+    return time
+
+
+def per_call_us(func, phrases: list[str], number: int, setup=None) -> float:
+    """Mean microseconds per call across all phrases"""
+    def run():
+        for phrase in phrases:
+            if setup:
+                setup()
+            func(phrase)
+    seconds = timeit.timeit(run, number=number)
+    return seconds / (number * len(phrases)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark natural-language date/time parsing")
+    parser.add_argument("--number", type=int, default=10000, help="Iterations over the phrase set")
+    args = parser.parse_args()
+
+    rows = [
+        ("date legacy strptime", per_call_us(legacy_parse_date, DATE_PHRASES, args.number)),
+        ("date cold (no memo)", per_call_us(parse_date, DATE_PHRASES, args.number, setup=clear_caches)),
+        ("date warm (memoized)", per_call_us(parse_date, DATE_PHRASES, args.number)),
+        ("time legacy strptime", per_call_us(legacy_parse_time, TIME_PHRASES, args.number)),
+        ("time cold (no memo)", per_call_us(parse_time, TIME_PHRASES, args.number, setup=clear_caches)),
+        ("time warm (memoized)", per_call_us(parse_time, TIME_PHRASES, args.number)),
+    ]
+
+    print("=" * 44)
+    print("OTTO DATE PARSING MICROBENCHMARK")
+    print("=" * 44)
+    for label, cost in rows:
+        print(f"  {label:24} {cost:8.2f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
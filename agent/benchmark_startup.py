@@ -0,0 +1,134 @@
+"""
+Otto Worker Startup Benchmark
+Measures the import cost of the agent modules with `python -X importtime`
+in fresh interpreters, lists the heaviest imports, checks that optional
+heavy dependencies stay deferred, and compares the agent's own share of the
+cold start (main's import tree minus the LiveKit framework) against a target.
+
+Run with: python benchmark_startup.py --runs 5 --output startup_report.txt
+Exits non-zero if the median own import cost of `main` exceeds the target.
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Imported by every worker no matter what the agent does, so it is reported
+# but left out of the target
+FRAMEWORK_MODULES = ["livekit.agents"]
+
+# Budget for main.py's imports on top of the framework (override with --target-ms);
+# startup_report.txt has the measurements it was set from
+STARTUP_TARGET_MS = float(os.getenv("STARTUP_TARGET_MS", "300"))
+
+# Must not be imported just by loading the worker module
+DEFERRED_MODULES = ["duckduckgo_search", "tokenc", "livekit.plugins.google", "livekit.plugins.silero"]
+
+
+def measure_import(module: str) -> tuple[float, dict[str, int]]:
+    """Import `module` in a fresh interpreter; returns (wall ms, cumulative µs per imported module)"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AGENT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        cumulative[name.strip()] = int(cumulative_us)
+    return wall_ms, cumulative
+
+
+def own_import_ms(imports: dict[str, int], modules: list[str]) -> float:
+    """Cumulative import time of `modules`, minus the framework they pulled in"""
+    framework_us = sum(imports.get(name, 0) for name in FRAMEWORK_MODULES)
+    return (sum(imports.get(name, 0) for name in modules) - framework_us) / 1000
+
+
+def build_report(modules: list[str], runs: int, top: int, target_ms: float) -> tuple[str, bool]:
+    lines = [
+        "=" * 60,
+        "OTTO WORKER STARTUP REPORT",
+        f"Python {sys.version.split()[0]} | runs per module: {runs} | target: {target_ms:.0f} ms",
+        "=" * 60,
+    ]
+    within_target = True
+    for module in modules:
+        walls = []
+        framework = []
+        own = []
+        imports: dict[str, int] = {}
+        for _ in range(runs):
+            wall_ms, imports = measure_import(module)
+            walls.append(wall_ms)
+            framework.append(sum(imports.get(name, 0) for name in FRAMEWORK_MODULES) / 1000)
+            own.append(own_import_ms(imports, [module]))
+        median = statistics.median(walls)
+        own_median = statistics.median(own)
+        lines.append("")
+        lines.append(f"import {module}: median {median:.0f} ms wall (min {min(walls):.0f}, max {max(walls):.0f})")
+        lines.append(f"  import tree total: {imports.get(module, 0) / 1000:.0f} ms")
+        lines.append(f"  framework ({', '.join(FRAMEWORK_MODULES)}): median {statistics.median(framework):.0f} ms")
+        lines.append(f"  agent's own imports: median {own_median:.0f} ms")
+        lines.append("  heaviest imports (cumulative):")
+        heaviest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:top]
+        for name, us in heaviest:
+            lines.append(f"    {us / 1000:8.1f} ms  {name}")
+
+        deferred = [name for name in DEFERRED_MODULES if name in imports]
+        if deferred:
+            lines.append(f"  ⚠️ eagerly imported (should be lazy): {', '.join(deferred)}")
+        else:
+            lines.append("  deferred imports: OK")
+
+        if module == "main":
+            # Before: the plugins and optional clients imported along with main
+            eager = []
+            for _ in range(runs):
+                _, eager_imports = measure_import(", ".join([module] + DEFERRED_MODULES))
+                eager.append(own_import_ms(eager_imports, [module] + DEFERRED_MODULES))
+            eager_median = statistics.median(eager)
+            lines.append(
+                f"  with deferred imports loaded eagerly (before): median {eager_median:.0f} ms own, "
+                f"{eager_median - own_median:.0f} ms moved out of the import"
+            )
+            ok = own_median <= target_ms
+            within_target = within_target and ok
+            lines.append(f"  own import target {target_ms:.0f} ms: {'MET ✅' if ok else 'MISSED ❌'}")
+    return "\n".join(lines), within_target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure agent worker import/startup time")
+    parser.add_argument("--modules", nargs="*", default=["main", "tools"], help="Modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=15, help="Heaviest imports to list")
+    parser.add_argument("--target-ms", type=float, default=STARTUP_TARGET_MS, help="Target for main's imports beyond the framework")
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report, ok = build_report(args.modules, args.runs, args.top, args.target_ms)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+        print(f"\n📄 Report saved to: {args.output}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
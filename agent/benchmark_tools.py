@@ -0,0 +1,218 @@
+"""
+Otto Tools Benchmark - Offline latency/throughput numbers for every tool
+Starts a local mock of the Next.js API, drives each function_tool at a
+configurable concurrency and rate, and reports throughput, tail latency
+and memory per tool.
+
+Run with: python benchmark_tools.py --calls 200 --concurrency 20 --latency-ms 150
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_api import MockAPIServer, add_mock_arguments, mock_config_from_args
+from metrics import registry
+
+# Default arguments per tool - mirrors what the realtime model usually sends
+TOOL_CALLS = {
+    "get_daily_briefing": {},
+    "get_github_activity": {"days_back": 1},
+    "get_unread_emails": {"max_count": 5},
+    "get_calendar_events": {"days_ahead": 1},
+    "create_calendar_event": {"title": "Benchmark sync", "date": "tomorrow", "time": "3pm"},
+    "send_email": {"to": "bench@example.com", "subject": "Benchmark", "body": "Hello from the benchmark"},
+    "search_web": {"query": "python asyncio tutorial"},
+}
+# search_web talks to DuckDuckGo directly, so it only runs with --include-search
+OFFLINE_TOOLS = [name for name in TOOL_CALLS if name != "search_web"]
+
+
+class BenchRunContext:
+    """Minimal RunContext stand-in carrying per-session userdata"""
+
+    def __init__(self, userdata):
+        self.userdata = userdata
+
+
+class PassThroughFlight:
+    """SingleFlight stand-in that lets every caller make its own fetch"""
+
+    async def do(self, key: tuple, fetch):
+        return await fetch()
+
+
+@dataclass
+class ToolReport:
+    tool: str
+    calls: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+    max_ms: Optional[float]
+    peak_kib: float
+
+
+def percentile(samples: list[float], p: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def bench_tool(
+    name: str,
+    tool,
+    calls: int,
+    concurrency: int,
+    rate: float,
+    users: int,
+) -> ToolReport:
+    """Drive one tool `calls` times with bounded concurrency and an optional rate limit"""
+    from tools import SessionData
+
+    kwargs = TOOL_CALLS[name]
+    contexts = [BenchRunContext(SessionData(user_id=f"bench-user-{i}")) for i in range(users)]
+    latencies: list[float] = []
+    exceptions = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal exceptions
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await tool(contexts[i % users], **kwargs)
+            except Exception:
+                exceptions += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    # Tools turn failures into apology strings; their spans record the error
+    registry.reset()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    tasks = []
+    for i in range(calls):
+        tasks.append(asyncio.create_task(one(i)))
+        if rate > 0:
+            await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+
+    return ToolReport(
+        tool=name,
+        calls=calls,
+        errors=exceptions + registry.snapshot().get(name, {}).get("errors", 0),
+        seconds=elapsed,
+        throughput=calls / elapsed if elapsed else 0.0,
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        p99_ms=percentile(latencies, 99),
+        max_ms=max(latencies) if latencies else None,
+        peak_kib=(peak - baseline) / 1024,
+    )
+
+
+def format_report(reports: list[ToolReport]) -> str:
+    def ms(value: Optional[float]) -> str:
+        return f"{value:8.1f}" if value is not None else "       -"
+
+    lines = [
+        f"{'tool':24} {'calls':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'peak KiB':>9}",
+        "-" * 96,
+    ]
+    for r in reports:
+        lines.append(
+            f"{r.tool:24} {r.calls:6d} {r.errors:6d} {r.throughput:8.1f} "
+            f"{ms(r.p50_ms)} {ms(r.p95_ms)} {ms(r.p99_ms)} {ms(r.max_ms)} {r.peak_kib:9.1f}"
+        )
+    return "\n".join(lines)
+
+
+async def run_benchmark(args: argparse.Namespace, api_url: str) -> list[ToolReport]:
+    # tools reads API_URL at import time; keep benchmark activity out of the real store
+    os.environ["API_URL"] = api_url
+    os.environ.setdefault("ACTIVITY_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="otto-bench-"), "activity.db"))
+    import tools
+    import cache
+    from http_client import close_http_client
+
+    if not args.cache:
+        # Measure the upstream path: nothing is stored, every call misses,
+        # and concurrent identical calls each make their own request
+        for name in cache.CACHE_TTLS:
+            cache.CACHE_TTLS[name] = (0.0, 0.0)
+        tools.ACTIVITY_SYNC_INTERVAL = 0.0
+        tools._single_flight = PassThroughFlight()
+    cache.response_cache.clear()
+
+    names = args.tools or (list(TOOL_CALLS) if args.include_search else OFFLINE_TOOLS)
+    reports = []
+    try:
+        for name in names:
+            tool = getattr(tools, name)
+            # Warm up connections so the first measured call isn't a cold handshake
+            await bench_tool(name, tool, min(args.concurrency, args.calls), args.concurrency, 0, args.users)
+            cache.response_cache.clear()
+            reports.append(await bench_tool(name, tool, args.calls, args.concurrency, args.rate, args.users))
+            print(f"  ✓ {name}")
+    finally:
+        await close_http_client()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Otto tools against a local mock API")
+    parser.add_argument("--calls", type=int, default=100, help="Measured calls per tool")
+    parser.add_argument("--concurrency", type=int, default=10, help="Max in-flight calls per tool")
+    parser.add_argument("--rate", type=float, default=0.0, help="Call start rate per second (0 = unthrottled)")
+    parser.add_argument("--users", type=int, default=1, help="Distinct user ids to rotate through")
+    parser.add_argument("--tools", nargs="*", choices=list(TOOL_CALLS), help="Subset of tools to run")
+    parser.add_argument("--include-search", action="store_true", help="Also run search_web (hits DuckDuckGo)")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache and request coalescing enabled")
+    parser.add_argument("--json", dest="json_path", help="Also write results as JSON to this path")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    config = mock_config_from_args(args)
+    print("=" * 60)
+    print("OTTO TOOLS BENCHMARK")
+    print(f"calls={args.calls} concurrency={args.concurrency} rate={args.rate or 'max'} users={args.users}")
+    print(f"mock: latency={config.latency_ms}±{config.jitter_ms}ms items={config.items} "
+          f"body_bytes={config.body_bytes} error_rate={config.error_rate}")
+    print("=" * 60)
+
+    tracemalloc.start()
+    with MockAPIServer(config) as server:
+        reports = asyncio.run(run_benchmark(args, server.url))
+    tracemalloc.stop()
+
+    print()
+    print(format_report(reports))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "args": vars(args),
+                "results": [asdict(r) for r in reports],
+            }, f, indent=2)
+        print(f"\n📄 Results saved to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Otto Voice Agent - Per-Turn Latency Budget
+One deadline per user turn, shared by every tool call (and compression) made
+while answering it, so chained tools can't add up to long silences.
+"""
+
+import os
+import time
+import functools
+from contextvars import ContextVar
+from typing import Optional
+
+# Total time the agent may spend in tools for one user turn
+TURN_BUDGET_SECONDS = float(os.getenv("TURN_BUDGET_SECONDS", "8.0"))
+# Never hand a call less than this - below it, callers should use a fallback
+MIN_CALL_SECONDS = 0.25
+
+
+class TurnBudget:
+    """Deadline for the current turn"""
+
+    def __init__(self, seconds: float = TURN_BUDGET_SECONDS):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds
+
+    def age(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhausted(self) -> bool:
+        return self.remaining() < MIN_CALL_SECONDS
+
+
+_current_budget: ContextVar[Optional[TurnBudget]] = ContextVar("otto_turn_budget", default=None)
+
+
+def current_budget() -> Optional[TurnBudget]:
+    return _current_budget.get()
+
+
+def budget_exhausted() -> bool:
+    """True if this turn has no time left for another upstream call"""
+    budget = _current_budget.get()
+    return budget is not None and budget.exhausted()
+
+
+def budget_timeout(cap: float) -> float:
+    """Timeout for the next call: the remaining turn budget, capped at `cap`"""
+    budget = _current_budget.get()
+    if budget is None:
+        return cap
+    return max(MIN_CALL_SECONDS, min(cap, budget.remaining()))
+
+
+def clear_budget() -> None:
+    """Detach the current task from any turn budget (for background work)"""
+    _current_budget.set(None)
+
+
+def start_turn(userdata) -> TurnBudget:
+    """Start a fresh budget for a new user turn (called from the session's turn events)"""
+    budget = TurnBudget()
+    userdata.turn_budget = budget
+    return budget
+
+
+def with_turn_budget(func):
+    """
+    Run a tool under its session's turn budget. Sessions whose turns are not
+    driven by turn events (console, benchmarks) give every call its own budget.
+    """
+    @functools.wraps(func)
+    async def wrapper(context, *args, **kwargs):
+        try:
+            userdata = context.userdata
+        except (AttributeError, ValueError):
+            userdata = None
+
+        if getattr(userdata, "turn_events", False):
+            budget = userdata.turn_budget or start_turn(userdata)
+        else:
+            budget = TurnBudget()
+
+        token = _current_budget.set(budget)
+        try:
+            return await func(context, *args, **kwargs)
+        finally:
+            _current_budget.reset(token)
+    return wrapper
@@ -0,0 +1,199 @@
+"""
+Otto Voice Agent - Tool Response Cache
+Per-user TTL + LRU cache for read-only tools with stale-while-revalidate
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional
+
+from budget import budget_exhausted, clear_budget
+from metrics import record_cache
+from log_pipeline import log_event
+
+logger = logging.getLogger("otto.cache")
+
+# Seconds a result is served as fresh, then how long it may be served stale
+# while a background refresh runs
+CACHE_TTLS = {
+    "get_github_activity": (120.0, 600.0),
+    "get_unread_emails": (30.0, 120.0),
+    "get_calendar_events": (60.0, 300.0),
+    "search_web": (600.0, 1800.0),
+}
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+
+# Said when the turn budget is spent and nothing is cached yet
+BUDGET_FALLBACK = "That's taking longer than expected. I'm still fetching it, ask me again in a moment."
+
+# A fetcher returns (result, cacheable, items) - errors and "not connected"
+# replies are returned to the user but never stored. Items are the records the
+# result reads out, in order (None if it reads none); they are cached with it.
+Fetcher = Callable[[], Awaitable[tuple[str, bool, Optional[list]]]]
+
+# What the last get_or_fetch in this task served: whether it answered with data
+# rather than an error or the budget fallback, and the items behind the answer
+_served: ContextVar[tuple[bool, Optional[list]]] = ContextVar("otto_cache_served", default=(True, None))
+
+
+def last_answered() -> bool:
+    return _served.get()[0]
+
+
+def last_items() -> Optional[list]:
+    return _served.get()[1]
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def make_key(user_id: Optional[str], tool: str, args: dict) -> tuple:
+    """Build a cache key from the user, tool name and normalized arguments."""
+    normalized = tuple(sorted((k, _normalize(v)) for k, v in args.items() if v is not None))
+    return (user_id or "", tool, normalized)
+
+
+class _Entry:
+    __slots__ = ("value", "items", "fetched_at", "ttl", "stale_ttl")
+
+    def __init__(self, value: str, ttl: float, stale_ttl: float, items: Optional[list] = None):
+        self.value = value
+        self.items = items
+        self.fetched_at = time.monotonic()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class ResponseCache:
+    """LRU cache of formatted tool results, scoped per user."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._refreshing: dict[tuple, asyncio.Task] = {}
+        # Bumped on invalidation so in-flight refreshes don't store old data
+        self._generations: dict[str, int] = {}
+        # Thread-executor jobs share this cache from different event loops
+        self._lock = threading.Lock()
+
+    def put(self, key: tuple, value: str, ttl: float, stale_ttl: float = 0.0, items: Optional[list] = None) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(value, ttl, stale_ttl, items)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _touch(self, key: tuple) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    async def get_or_fetch(
+        self,
+        user_id: Optional[str],
+        tool: str,
+        args: dict,
+        fetch: Fetcher,
+    ) -> str:
+        """Serve from cache when fresh, serve stale + refresh in background, else fetch."""
+        ttl, stale_ttl = CACHE_TTLS.get(tool, (0.0, 0.0))
+        key = make_key(user_id, tool, args)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            age = entry.age()
+            if age < entry.ttl:
+                self._touch(key)
+                record_cache("hit")
+                log_event(logger, "cache", f"Cache hit: {tool}", tool=tool, outcome="hit", age_s=round(age, 1))
+                _served.set((True, entry.items))
+                return entry.value
+            if age < entry.ttl + entry.stale_ttl:
+                self._touch(key)
+                record_cache("stale")
+                log_event(logger, "cache", f"Cache stale hit: {tool}, refreshing", tool=tool, outcome="stale", age_s=round(age, 1))
+                self._schedule_refresh(key, user_id, fetch, ttl, stale_ttl)
+                _served.set((True, entry.items))
+                return entry.value
+
+        if budget_exhausted():
+            # No time left this turn: serve whatever we last had (even if expired)
+            # and let a background fetch warm the cache for the next ask
+            self._schedule_refresh(key, user_id, fetch, ttl, stale_ttl)
+            if entry is not None:
+                record_cache("stale")
+                logger.info(f"Turn budget spent, serving expired {tool} ({entry.age():.0f}s old)")
+                _served.set((True, entry.items))
+                return entry.value
+            record_cache("miss")
+            logger.info(f"Turn budget spent, deferring {tool}")
+            _served.set((False, None))
+            return BUDGET_FALLBACK
+
+        record_cache("miss")
+        log_event(logger, "cache", f"Cache miss: {tool}", tool=tool, outcome="miss")
+        generation = self._generations.get(user_id or "", 0)
+        value, cacheable, items = await fetch()
+        _served.set((cacheable, items))
+        if cacheable and ttl > 0 and generation == self._generations.get(user_id or "", 0):
+            self.put(key, value, ttl, stale_ttl, items)
+        elif not cacheable and entry is not None and budget_exhausted():
+            # The fetch ran out the turn budget - older data beats an apology
+            logger.info(f"Fetch failed with budget spent, serving expired {tool}")
+            _served.set((True, entry.items))
+            return entry.value
+        return value
+
+    def _schedule_refresh(
+        self,
+        key: tuple,
+        user_id: Optional[str],
+        fetch: Fetcher,
+        ttl: float,
+        stale_ttl: float,
+    ) -> None:
+        if key in self._refreshing:
+            return
+        generation = self._generations.get(user_id or "", 0)
+
+        async def refresh():
+            # Background work isn't bound by the turn that triggered it
+            clear_budget()
+            try:
+                value, cacheable, items = await fetch()
+                if cacheable and generation == self._generations.get(user_id or "", 0):
+                    self.put(key, value, ttl, stale_ttl, items)
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def invalidate(self, user_id: Optional[str], tools: Optional[list[str]] = None) -> None:
+        """Drop a user's cached results (optionally only for some tools)."""
+        user_key = user_id or ""
+        with self._lock:
+            self._generations[user_key] = self._generations.get(user_key, 0) + 1
+            for key in list(self._entries):
+                if key[0] == user_key and (tools is None or key[1] in tools):
+                    del self._entries[key]
+        logger.info(f"Cache invalidated for {tools or 'all tools'}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,225 @@
+"""
+Otto Voice Agent - Record/Replay Cassettes
+Records what the tools' upstream calls (Next.js API over httpx, DuckDuckGo
+searches, Token Company compressions) returned and how long they took, then
+serves them back offline - at the recorded latency or at full speed - so tool
+benchmarks are repeatable without a server or real tokens.
+
+Enable with OTTO_CASSETTE=path/to/session.jsonl and OTTO_CASSETTE_MODE=record|replay.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+logger = logging.getLogger("otto.cassette")
+
+CASSETTE_PATH = os.getenv("OTTO_CASSETTE")
+CASSETTE_MODE = os.getenv("OTTO_CASSETTE_MODE", "replay").lower()
+# Replayed latency = recorded latency * scale (0 = full speed)
+CASSETTE_LATENCY_SCALE = float(os.getenv("OTTO_CASSETTE_LATENCY_SCALE", "1.0"))
+
+# Query params derived from the clock; matching ignores them so a cassette
+# recorded yesterday still replays today
+VOLATILE_PARAMS = {"start", "end", "since", "timeMin", "timeMax"}
+
+# JSON fields whose values never reach a cassette
+SECRET_FIELDS = {
+    "access_token", "refresh_token", "id_token", "token", "api_key",
+    "apiKey", "secret", "client_secret", "password", "authorization",
+}
+# Response headers worth keeping (everything else is dropped, cookies included)
+KEPT_HEADERS = {"content-type"}
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recorded interaction for a call"""
+
+
+def redact_secrets(value: Any) -> Any:
+    """Blank out SECRET_FIELDS values, recursively"""
+    if isinstance(value, dict):
+        return {k: "<redacted>" if k in SECRET_FIELDS and v else redact_secrets(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact_secrets(v) for v in value]
+    return value
+
+
+def _user_tag(user_id: Optional[str]) -> str:
+    # Replays stay per-user without writing the raw id to disk
+    return hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:10] if user_id else "-"
+
+
+def request_key(request: httpx.Request) -> str:
+    """Match key for an HTTP request: method, path, stable query params and user"""
+    params = sorted(
+        (k, v) for k, v in parse_qsl(request.url.query.decode("ascii"), keep_blank_values=True)
+        if k not in VOLATILE_PARAMS
+    )
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{request.method} {request.url.path}{query} user={_user_tag(request.headers.get('X-User-ID'))}"
+
+
+class Cassette:
+    """
+    An ordered log of interactions. Calls with the same key replay in the order
+    they were recorded (the last one repeats once they run out), so a session
+    that checks the same endpoint twice sees both answers.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency_scale: float = CASSETTE_LATENCY_SCALE):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        self._positions: dict[tuple[str, str], int] = defaultdict(int)
+        self.recorded = 0
+
+        if mode == "replay":
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[(entry["kind"], entry["key"])].append(entry)
+            logger.info(f"Replaying {sum(map(len, self._entries.values()))} interactions from {path}")
+        else:
+            # Start a fresh recording
+            open(path, "w").close()
+            logger.info(f"Recording interactions to {path}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def record(self, kind: str, key: str, elapsed_ms: float, **payload) -> None:
+        entry = {"kind": kind, "key": key, "elapsed_ms": round(elapsed_ms, 1), **payload}
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+            self.recorded += 1
+
+    def lookup(self, kind: str, key: str) -> dict:
+        with self._lock:
+            entries = self._entries.get((kind, key))
+            if not entries:
+                raise CassetteMiss(f"No recorded {kind} interaction for {key}")
+            position = self._positions[(kind, key)]
+            self._positions[(kind, key)] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+    def delay(self, entry: dict) -> float:
+        return entry["elapsed_ms"] * self.latency_scale / 1000
+
+    def call(self, kind: str, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run a blocking call through the cassette: record its JSON-serializable
+        result, or replay it (sleeping the recorded latency on this thread).
+        """
+        if self.replaying:
+            entry = self.lookup(kind, key)
+            time.sleep(self.delay(entry))
+            return entry["result"]
+        started = time.perf_counter()
+        result = fn()
+        self.record(kind, key, (time.perf_counter() - started) * 1000, result=result)
+        return result
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests to the real transport and records the responses"""
+
+    def __init__(self, cassette: Cassette, transport: httpx.AsyncBaseTransport):
+        self.cassette = cassette
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS}
+        payload: dict[str, Any] = {"status": response.status_code, "headers": headers}
+        try:
+            payload["json"] = redact_secrets(json.loads(content)) if content else None
+        except ValueError:
+            payload["text"] = content.decode("utf-8", errors="replace")
+        self.cassette.record("http", request_key(request), elapsed_ms, **payload)
+
+        # The content is already decoded, so its encoding headers no longer apply
+        passthrough = [
+            (k, v) for k, v in response.headers.multi_items()
+            if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=passthrough,
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answers requests from the cassette without touching the network"""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.cassette.lookup("http", request_key(request))
+        await asyncio.sleep(self.cassette.delay(entry))
+        if "json" in entry:
+            content = json.dumps(entry["json"]).encode("utf-8") if entry["json"] is not None else b""
+        else:
+            content = entry.get("text", "").encode("utf-8")
+        return httpx.Response(
+            status_code=entry["status"],
+            headers=entry.get("headers", {}),
+            content=content,
+            request=request,
+        )
+
+
+_cassette: Optional[Cassette] = None
+_loaded = False
+
+
+def use_cassette(path: Optional[str], mode: str = "replay", latency_scale: float = CASSETTE_LATENCY_SCALE) -> Optional[Cassette]:
+    """Install a cassette for this process (None turns recording/replay off)"""
+    global _cassette, _loaded
+    _cassette = Cassette(path, mode, latency_scale) if path else None
+    _loaded = True
+    return _cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The active cassette, loaded from OTTO_CASSETTE on first use"""
+    if not _loaded:
+        use_cassette(CASSETTE_PATH, CASSETTE_MODE)
+    return _cassette
+
+
+def http_transport(**transport_options) -> Optional[httpx.AsyncBaseTransport]:
+    """Transport for the shared client when a cassette is active, else None"""
+    cassette = get_cassette()
+    if cassette is None:
+        return None
+    if cassette.replaying:
+        return ReplayTransport(cassette)
+    return RecordingTransport(cassette, httpx.AsyncHTTPTransport(**transport_options))
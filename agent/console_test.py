@@ -1,12 +1,33 @@
 """
 Otto Console Mode - Test the agent via text input (no microphone needed)
 Run with: python console_test.py
+
+Batch mode replays a script of commands through the same tools and reports
+per-command timing, optionally against an earlier run:
+    python console_test.py --script session.txt --json run.json
+    python console_test.py --script session.jsonl --concurrency 4 --baseline run.json
+
+--record saves every upstream exchange to a cassette; --replay serves them back
+offline at the recorded latency (or faster with --replay-latency 0):
+    python console_test.py --script session.txt --record session.cassette.jsonl
+    python console_test.py --script session.txt --replay session.cassette.jsonl
+
+A script is either console commands, one per line ("#" starts a comment), or
+JSONL with one invocation per line:
+    {"tool": "get_calendar_events", "args": {"days_ahead": 7}, "label": "week"}
+    {"command": "github acme/otto"}
 """
 
+import argparse
 import asyncio
+import dataclasses
+import json
 import os
 import sys
-from datetime import datetime
+import time
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Optional
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -14,122 +35,140 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from dotenv import load_dotenv
 load_dotenv()
 
+# Tools a script may invoke by name
+SCRIPT_TOOLS = {
+    "get_daily_briefing",
+    "get_github_activity",
+    "get_unread_emails",
+    "get_calendar_events",
+    "create_calendar_event",
+    "send_email",
+    "search_web",
+    "lookup_recent_results",
+}
+
+# A command this much slower than its baseline (and by more than the noise
+# floor) is reported as a regression
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_MS = 50.0
+
+PREVIEW_CHARS = 80
+
+
 # Mock RunContext for testing
 class MockRunContext:
-    pass
+    def __init__(self, userdata=None):
+        self.userdata = userdata
+
+
+def parse_command(line: str) -> tuple[str, dict]:
+    """Turn a console command into (tool name, kwargs); ValueError if it isn't one"""
+    parts = line.split()
+    command = parts[0].lower()
+
+    if command == 'briefing':
+        return "get_daily_briefing", {}
+    if command == 'github':
+        repo = parts[1] if len(parts) > 1 else None
+        return "get_github_activity", {"repo_name": repo, "days_back": 1}
+    if command == 'emails':
+        return "get_unread_emails", {"max_count": 5}
+    if command == 'calendar':
+        days = int(parts[1]) if len(parts) > 1 else 1
+        return "get_calendar_events", {"days_ahead": days}
+    if command == 'schedule':
+        if len(parts) < 4:
+            raise ValueError("Usage: schedule <title> <date> <time> (e.g. schedule Meeting tomorrow 3pm)")
+        return "create_calendar_event", {"title": parts[1], "date": parts[2], "time": parts[3]}
+    if command == 'lookup':
+        if len(parts) < 2:
+            raise ValueError("Usage: lookup <source> [position|text] (e.g. lookup email 2)")
+        rest = " ".join(parts[2:])
+        if rest.lstrip("-").isdigit():
+            return "lookup_recent_results", {"source": parts[1], "position": int(rest)}
+        return "lookup_recent_results", {"source": parts[1], "match": rest or None}
+    if command == 'search':
+        query = " ".join(parts[1:]) if len(parts) > 1 else "test"
+        return "search_web", {"query": query}
+    raise ValueError(f"Unknown command: {command}")
+
+
+async def call_tool(ctx, tool_name: str, kwargs: dict) -> str:
+    """Run a tool the way the session does (instrumented, budgeted, cached)"""
+    import tools
+    if tool_name not in SCRIPT_TOOLS:
+        raise ValueError(f"Unknown tool: {tool_name}")
+    return await getattr(tools, tool_name)(ctx, **kwargs)
+
+
+def test_dates() -> None:
+    from date_parsing import parse_date, parse_time
+    test_cases = [
+        "today", "tomorrow", "January 28th",
+        "Feb 15", "September 28", "next week",
+        "next Monday", "in 3 days", "end of week", "August 1st"
+    ]
+    print("Date parsing results:")
+    for date_str in test_cases:
+        result = parse_date(date_str) or date_str
+        print(f"  {date_str:20} → {result}")
+    print("Time parsing results:")
+    for time_str in ["3pm", "9:15am", "15:30", "noon"]:
+        print(f"  {time_str:20} → {parse_time(time_str) or time_str}")
+
 
 async def main():
     """Interactive console to test Otto's tools"""
-    from tools import (
-        get_github_activity,
-        get_unread_emails,
-        get_calendar_events,
-        create_calendar_event,
-        send_email,
-        search_web,
-        log_tool_call,
-        log_tool_result,
-    )
-    
+    from log_pipeline import setup_logging
+    setup_logging(fmt="console")
+
     print("\n" + "=" * 60)
     print("🤖 OTTO CONSOLE MODE")
     print("=" * 60)
     print("Test Otto's tools by typing commands.")
     print("Type 'quit' to exit.\n")
     print("Available commands:")
+    print("  briefing           - Get the daily briefing")
     print("  github [repo]      - Get GitHub activity")
     print("  emails             - Get unread emails")
-    print("  calendar           - Get today's calendar")
+    print("  calendar [days]    - Get today's calendar (or the next N days)")
     print("  schedule <title> <date> <time>  - Create event")
     print("  search <query>     - Web search")
+    print("  lookup <source> [position|text]  - Look up an earlier result")
     print("  test-dates         - Test date parsing")
     print("=" * 60 + "\n")
-    
-    ctx = MockRunContext()
-    
+
+    from tools import SessionData
+    # Session state (the working set behind "lookup") lasts for the whole console session
+    ctx = MockRunContext(SessionData())
+
     while True:
         try:
             user_input = input("\033[1;36mYou:\033[0m ").strip()
-            
+
             if not user_input:
                 continue
-                
+
             if user_input.lower() == 'quit':
                 print("\n👋 Goodbye!")
                 break
-            
-            parts = user_input.split()
-            command = parts[0].lower()
-            
+
             print()  # Empty line for readability
-            
-            if command == 'github':
-                repo = parts[1] if len(parts) > 1 else None
-                # Call the function directly since it's decorated
-                result = await get_github_activity.__wrapped__(ctx, repo_name=repo, days_back=1)
-                print(f"\033[1;32mOtto:\033[0m {result}")
-                
-            elif command == 'emails':
-                result = await get_unread_emails.__wrapped__(ctx, max_count=5)
-                print(f"\033[1;32mOtto:\033[0m {result}")
-                
-            elif command == 'calendar':
-                result = await get_calendar_events.__wrapped__(ctx, days_ahead=1)
-                print(f"\033[1;32mOtto:\033[0m {result}")
-                
-            elif command == 'schedule':
-                if len(parts) < 4:
-                    print("\033[1;31mUsage:\033[0m schedule <title> <date> <time>")
-                    print("Example: schedule Meeting tomorrow 3pm")
+
+            if user_input.lower() == 'test-dates':
+                test_dates()
+            else:
+                try:
+                    tool_name, kwargs = parse_command(user_input)
+                except ValueError as e:
+                    print(f"\033[1;33m{e}\033[0m")
+                    print("Try: briefing, github, emails, calendar, schedule, search, lookup, test-dates")
                 else:
-                    title = parts[1]
-                    date = parts[2]
-                    time = parts[3]
-                    result = await create_calendar_event.__wrapped__(
-                        ctx, title=title, date=date, time=time
-                    )
+                    result = await call_tool(ctx, tool_name, kwargs)
                     print(f"\033[1;32mOtto:\033[0m {result}")
-                    
-            elif command == 'search':
-                query = " ".join(parts[1:]) if len(parts) > 1 else "test"
-                result = await search_web.__wrapped__(ctx, query=query)
-                print(f"\033[1;32mOtto:\033[0m {result}")
-                
-            elif command == 'test-dates':
-                from datetime import timedelta
-                test_cases = [
-                    "today", "tomorrow", "January 28th", 
-                    "Feb 15", "September 28", "next week"
-                ]
-                print("Date parsing results:")
-                for date_str in test_cases:
-                    date_lower = date_str.lower().strip()
-                    if date_lower == "today":
-                        result = datetime.now().strftime("%Y-%m-%d")
-                    elif date_lower == "tomorrow":
-                        result = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-                    elif date_lower == "next week":
-                        result = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
-                    else:
-                        clean = date_lower.replace("st","").replace("nd","").replace("rd","").replace("th","")
-                        try:
-                            parsed = datetime.strptime(clean, "%B %d")
-                            parsed = parsed.replace(year=datetime.now().year)
-                            result = parsed.strftime("%Y-%m-%d")
-                        except:
-                            try:
-                                parsed = datetime.strptime(clean, "%b %d")
-                                parsed = parsed.replace(year=datetime.now().year)
-                                result = parsed.strftime("%Y-%m-%d")
-                            except:
-                                result = date_str
-                    print(f"  {date_str:20} → {result}")
-            else:
-                print(f"\033[1;33mUnknown command:\033[0m {command}")
-                print("Try: github, emails, calendar, schedule, search, test-dates")
-            
+
             print()  # Empty line after response
-            
+
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye!")
             break
@@ -138,5 +177,260 @@ async def main():
             import traceback
             traceback.print_exc()
 
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ScriptStep:
+    index: int
+    label: str
+    tool: str
+    args: dict
+
+
+@dataclass
+class StepResult:
+    index: int
+    label: str
+    tool: str
+    args: dict
+    ms: float
+    chars: int
+    preview: str
+    cache: Optional[str] = None
+    http_ms: Optional[float] = None
+    http_calls: int = 0
+    error: Optional[str] = None
+    baseline_ms: Optional[float] = None
+
+    @property
+    def regressed(self) -> bool:
+        if self.baseline_ms is None:
+            return False
+        return self.ms > self.baseline_ms * REGRESSION_RATIO and self.ms - self.baseline_ms > REGRESSION_MIN_MS
+
+
+def load_script(path: str) -> list[ScriptStep]:
+    """Read console commands or JSONL invocations; raises ValueError on a bad line"""
+    steps = []
+    with open(path) as f:
+        for line_number, raw in enumerate(f, 1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                if line.startswith("{"):
+                    entry = json.loads(line)
+                    if "command" in entry:
+                        tool, args = parse_command(entry["command"])
+                        label = entry.get("label", entry["command"])
+                    else:
+                        tool, args = entry["tool"], entry.get("args", {})
+                        label = entry.get("label", tool)
+                else:
+                    tool, args = parse_command(line)
+                    label = line
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from None
+            if tool not in SCRIPT_TOOLS:
+                raise ValueError(f"{path}:{line_number}: unknown tool {tool}")
+            steps.append(ScriptStep(index=len(steps), label=label, tool=tool, args=args))
+    return steps
+
+
+async def run_step(step: ScriptStep, session) -> StepResult:
+    from budget import start_turn
+    from cache import BUDGET_FALLBACK
+    from metrics import collect_spans
+
+    # Each step is a user turn with its own latency budget; the working set is
+    # shared so lookups see earlier steps' results
+    userdata = dataclasses.replace(session, turn_budget=None, turn_events=True)
+    budget = start_turn(userdata)
+    ctx = MockRunContext(userdata)
+
+    # Each step runs in its own task, so its spans don't mix with concurrent ones
+    spans = collect_spans()
+    error = None
+    started = time.perf_counter()
+    try:
+        result = await call_tool(ctx, step.tool, step.args)
+    except Exception as e:
+        result = ""
+        error = f"{type(e).__name__}: {e}"
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    span = spans[-1] if spans else None
+    if error is None and result == BUDGET_FALLBACK:
+        # Deferred to a background fetch - nothing was answered
+        error = "turn budget exhausted"
+    elif span is not None and span.error and error is None:
+        # Tools turn failures into apologies; the span knows it wasn't a real answer
+        if budget.exhausted():
+            error = "turn budget exhausted"
+        else:
+            error = f"HTTP {span.status_code}" if span.status_code else "tool error"
+    return StepResult(
+        index=step.index,
+        label=step.label,
+        tool=step.tool,
+        args=step.args,
+        ms=elapsed_ms,
+        chars=len(result),
+        preview=" ".join(result.split())[:PREVIEW_CHARS],
+        cache=span.cache if span else None,
+        http_ms=span.http_ms if span and span.http_calls else None,
+        http_calls=span.http_calls if span else 0,
+        error=error,
+    )
+
+
+async def run_script(steps: list[ScriptStep], concurrency: int, user_id: Optional[str]) -> list[StepResult]:
+    """Run the steps in order (or up to `concurrency` at a time) as one session"""
+    from tools import SessionData, set_current_user_id
+
+    if user_id:
+        set_current_user_id(user_id)
+    session = SessionData(user_id=user_id)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def one(step: ScriptStep) -> StepResult:
+        async with semaphore:
+            return await run_step(step, session)
+
+    # Tasks start in script order, so with concurrency 1 this is sequential
+    return list(await asyncio.gather(*(asyncio.create_task(one(step)) for step in steps)))
+
+
+def apply_baseline(results: list[StepResult], path: str) -> None:
+    """Attach the baseline's timing to each step with the same position and label"""
+    with open(path) as f:
+        baseline = json.load(f)
+    by_step = {(entry["index"], entry["label"]): entry["ms"] for entry in baseline.get("steps", [])}
+    for result in results:
+        result.baseline_ms = by_step.get((result.index, result.label))
+
+
+def format_report(results: list[StepResult], wall_seconds: float) -> str:
+    from benchmark_tools import percentile
+
+    has_baseline = any(r.baseline_ms is not None for r in results)
+    header = f"{'#':>3} {'command':32} {'ms':>8} {'http ms':>8} {'cache':>6} {'chars':>6}"
+    if has_baseline:
+        header += f" {'base ms':>8} {'Δ ms':>8}"
+    lines = [header, "-" * len(header)]
+
+    for r in results:
+        http = f"{r.http_ms:8.1f}" if r.http_ms is not None else "       -"
+        line = f"{r.index + 1:3d} {r.label[:32]:32} {r.ms:8.1f} {http} {r.cache or '-':>6} {r.chars:6d}"
+        if has_baseline:
+            if r.baseline_ms is not None:
+                line += f" {r.baseline_ms:8.1f} {r.ms - r.baseline_ms:+8.1f}"
+            else:
+                line += f" {'-':>8} {'-':>8}"
+        if r.error:
+            line += f"  ❌ {r.error}"
+        elif r.regressed:
+            line += "  ⚠️  slower"
+        lines.append(line)
+        lines.append(f"    {r.preview}")
+
+    timings = [r.ms for r in results]
+    lines.append("-" * len(header))
+    lines.append(
+        f"📊 {len(results)} commands in {wall_seconds:.2f}s  |  "
+        f"p50 {percentile(timings, 50) or 0:.1f} ms  p95 {percentile(timings, 95) or 0:.1f} ms  "
+        f"max {max(timings, default=0):.1f} ms  |  errors {sum(1 for r in results if r.error)}"
+    )
+    if has_baseline:
+        compared = [r for r in results if r.baseline_ms is not None]
+        total = sum(r.ms for r in compared)
+        base_total = sum(r.baseline_ms for r in compared)
+        change = (total / base_total - 1) * 100 if base_total else 0.0
+        lines.append(
+            f"📈 vs baseline: {base_total:.1f} → {total:.1f} ms ({change:+.1f}%) over {len(compared)} commands, "
+            f"{sum(1 for r in results if r.regressed)} slower than {REGRESSION_RATIO}x"
+        )
+    return "\n".join(lines)
+
+
+async def batch_main(args: argparse.Namespace) -> int:
+    from log_pipeline import setup_logging
+    setup_logging(fmt="console", level=args.log_level)
+
+    try:
+        steps = load_script(args.script)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    if not steps:
+        print(f"❌ No commands in {args.script}")
+        return 2
+
+    if args.api_url:
+        # tools reads API_URL at import time
+        os.environ["API_URL"] = args.api_url
+    if args.record or args.replay:
+        from cassette import use_cassette
+        try:
+            use_cassette(args.record or args.replay, "record" if args.record else "replay", args.replay_latency)
+        except OSError as e:
+            print(f"❌ {e}")
+            return 2
+        # Start from an empty activity store so recording and replay sync the same way
+        os.environ.setdefault("ACTIVITY_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="otto-cassette-"), "activity.db"))
+
+    print(f"🎬 Running {len(steps)} commands from {args.script} (concurrency {args.concurrency})\n")
+    started = time.perf_counter()
+    results = await run_script(steps, args.concurrency, args.user_id)
+    wall_seconds = time.perf_counter() - started
+
+    if args.baseline:
+        apply_baseline(results, args.baseline)
+    print(format_report(results, wall_seconds))
+
+    if args.record:
+        from cassette import get_cassette
+        print(f"\n📼 Recorded {get_cassette().recorded} interactions to {args.record}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "script": args.script,
+                "concurrency": args.concurrency,
+                "wall_seconds": wall_seconds,
+                "steps": [asdict(r) for r in results],
+            }, f, indent=2)
+        print(f"\n💾 Wrote {args.json}")
+
+    if any(r.error for r in results):
+        return 1
+    if args.fail_on_regression and any(r.regressed for r in results):
+        return 1
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Test Otto's tools from the console, interactively or from a script")
+    parser.add_argument("--script", help="Run commands from this file (console commands or JSONL) and exit")
+    parser.add_argument("--concurrency", type=int, default=1, help="Commands in flight at once in batch mode")
+    parser.add_argument("--user-id", default=os.getenv("OTTO_USER_ID"), help="User the tools act as")
+    parser.add_argument("--api-url", help="Next.js API to call (defaults to API_URL)")
+    parser.add_argument("--json", help="Write per-command results to this file")
+    parser.add_argument("--baseline", help="Compare against a results file written by --json")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero if a command got slower than its baseline")
+    cassettes = parser.add_mutually_exclusive_group()
+    cassettes.add_argument("--record", metavar="CASSETTE", help="Record upstream calls (API, search, compression) to this file")
+    cassettes.add_argument("--replay", metavar="CASSETTE", help="Serve upstream calls from this recording instead of the network")
+    parser.add_argument("--replay-latency", type=float, default=1.0, help="Scale replayed latencies (0 = full speed)")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for batch mode")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.script:
+        sys.exit(asyncio.run(batch_main(args)))
     asyncio.run(main())
@@ -0,0 +1,218 @@
+"""
+Otto Voice Agent - Natural Language Date/Time Parsing
+Precompiled grammar for the dates and times people say out loud, shared by
+create_calendar_event and the console/test scripts.
+
+Dates resolve to "YYYY-MM-DD" and times to "HH:MM" (24-hour). Results are
+memoized per (phrase, reference day), so repeated phrases cost a dict lookup.
+"""
+
+import re
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_WEEKDAY_ABBREV = {name[:3]: i for i, name in enumerate(WEEKDAYS)}
+_WEEKDAY_ABBREV.update({"tues": 1, "weds": 2, "thur": 3, "thurs": 3})
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+_MONTHS["sept"] = 9
+
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "couple": 2, "a couple of": 2, "few": 3, "a few": 3,
+}
+
+_WEEKDAY = r"(?P<weekday>monday|tuesday|wednesday|thursday|friday|saturday|sunday|mon|tues?|weds?|thu(?:rs?)?|fri|sat|sun)"
+_MONTH = r"(?P<month>january|february|march|april|may|june|july|august|september|october|november|december|jan|feb|mar|apr|jun|jul|aug|sept?|oct|nov|dec)\.?"
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s+(?P<year>\d{4}))?"
+_COUNT = r"(?P<count>\d+|a couple of|a few|couple|few|an?|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)"
+
+_FILLER = re.compile(r"^(?:on|for|by)\s+|\bthe\s+|[,!?]+$")
+_SPACES = re.compile(r"\s+")
+
+_DATE_PATTERNS = [
+    ("iso", re.compile(r"^(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})$")),
+    ("numeric", re.compile(r"^(?P<month>\d{1,2})[/-](?P<day>\d{1,2})(?:[/-](?P<year>\d{2}|\d{4}))?$")),
+    ("keyword", re.compile(r"^(?P<keyword>today|tonight|tomorrow|tmrw|day after tomorrow|next week|this weekend|next weekend|end of (?:this |next )?(?:week|month))$")),
+    ("relative", re.compile(rf"^in\s+{_COUNT}\s+(?P<unit>days?|weeks?)$")),
+    ("relative", re.compile(rf"^{_COUNT}\s+(?P<unit>days?|weeks?)\s+from\s+(?:now|today)$")),
+    ("weekday", re.compile(rf"^(?:(?P<modifier>this|next|coming)\s+)?{_WEEKDAY}(?:\s+(?P<suffix>next week|this week))?$")),
+    ("month_day", re.compile(rf"^(?:{_WEEKDAY},?\s+)?{_MONTH}\s+{_DAY}{_YEAR}$")),
+    ("day_month", re.compile(rf"^(?:{_WEEKDAY},?\s+)?{_DAY}(?:\s+of)?\s+{_MONTH}{_YEAR}$")),
+    ("day_only", re.compile(rf"^{_DAY}$")),
+]
+
+# "3pm", "3:30 p.m.", "3.30pm" and the compact "930am"
+_TIME_12H = re.compile(r"^(?P<hour>\d{1,2})(?:[:.]?(?P<minute>\d{2}))?\s*(?P<meridiem>a\.?m\.?|p\.?m\.?)$")
+_TIME_24H = re.compile(r"^(?P<hour>\d{1,2})(?::|h)?(?P<minute>\d{2})?(?:\s*o'?clock)?$")
+# A bare "at 3" means the afternoon - meetings almost never start between 1 and 7am
+_BARE_PM_HOURS = range(1, 8)
+_TIME_WORDS = {"noon": "12:00", "midday": "12:00", "midnight": "00:00", "morning": "09:00",
+               "afternoon": "14:00", "evening": "18:00", "tonight": "19:00"}
+
+
+def _normalize(text: str) -> str:
+    text = _SPACES.sub(" ", text.strip().lower())
+    return _FILLER.sub("", text).strip()
+
+
+def _count(value: str) -> int:
+    return int(value) if value.isdigit() else _NUMBER_WORDS[value]
+
+
+def _weekday_index(name: str) -> int:
+    return WEEKDAYS.index(name) if name in WEEKDAYS else _WEEKDAY_ABBREV[name]
+
+
+def _next_weekday(today: date, weekday: int) -> date:
+    """Next occurrence of weekday strictly after today"""
+    days_ahead = weekday - today.weekday()
+    if days_ahead <= 0:  # Target day is today or has passed this week
+        days_ahead += 7
+    return today + timedelta(days=days_ahead)
+
+
+def _month_day(today: date, month: int, day: int, year: Optional[str]) -> Optional[date]:
+    """Calendar date; without a year, the next time that month/day comes round"""
+    try:
+        if year:
+            return date(int(year), month, day)
+        resolved = date(today.year, month, day)
+        if resolved < today:
+            resolved = date(today.year + 1, month, day)
+        return resolved
+    except ValueError:
+        return None
+
+
+def _keyword(today: date, keyword: str) -> date:
+    if keyword in ("today", "tonight"):
+        return today
+    if keyword in ("tomorrow", "tmrw"):
+        return today + timedelta(days=1)
+    if keyword == "day after tomorrow":
+        return today + timedelta(days=2)
+    if keyword == "next week":
+        return today + timedelta(days=7)
+    if keyword == "this weekend":
+        return today if today.weekday() >= 5 else _next_weekday(today, 5)
+    if keyword == "next weekend":
+        return _next_weekday(today, 5) + timedelta(days=7 if today.weekday() >= 5 else 0)
+    if keyword.endswith("month"):
+        year, month = today.year, today.month
+        if "next" in keyword:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return date(year, month, calendar.monthrange(year, month)[1])
+    # End of week = Friday; past Friday it means the coming one
+    friday = today + timedelta(days=4 - today.weekday())
+    if friday < today:
+        friday += timedelta(days=7)
+    if "next" in keyword:
+        friday += timedelta(days=7)
+    return friday
+
+
+@lru_cache(maxsize=1024)
+def _parse_date_cached(phrase: str, today: date) -> Optional[date]:
+    for kind, pattern in _DATE_PATTERNS:
+        match = pattern.match(phrase)
+        if not match:
+            continue
+        groups = match.groupdict()
+        if kind == "iso":
+            try:
+                return date(int(groups["year"]), int(groups["month"]), int(groups["day"]))
+            except ValueError:
+                return None
+        if kind == "numeric":
+            year = groups["year"]
+            if year and len(year) == 2:
+                year = f"20{year}"
+            return _month_day(today, int(groups["month"]), int(groups["day"]), year)
+        if kind == "keyword":
+            return _keyword(today, groups["keyword"])
+        if kind == "relative":
+            count = _count(groups["count"])
+            return today + timedelta(days=count * (7 if groups["unit"].startswith("week") else 1))
+        if kind == "weekday":
+            resolved = _next_weekday(today, _weekday_index(groups["weekday"]))
+            if groups["suffix"] == "next week" and resolved - today < timedelta(days=7):
+                # "monday next week" - the occurrence in the following calendar week
+                start_of_next_week = today + timedelta(days=7 - today.weekday())
+                resolved = start_of_next_week + timedelta(days=_weekday_index(groups["weekday"]))
+            return resolved
+        if kind in ("month_day", "day_month"):
+            return _month_day(today, _MONTHS[groups["month"]], int(groups["day"]), groups["year"])
+        if kind == "day_only":
+            day = int(groups["day"])
+            resolved = _month_day(today, today.month, day, str(today.year))
+            if resolved is None or resolved < today:
+                year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+                return _month_day(today, month, day, str(year))
+            return resolved
+    return None
+
+
+def parse_date(text: str, today: Optional[date] = None) -> Optional[str]:
+    """
+    Parse a spoken date into "YYYY-MM-DD".
+
+    Understands ISO and US numeric dates, "today"/"tomorrow", weekdays
+    ("friday", "next monday" - the next occurrence after today), relative
+    phrases ("in 3 days", "two weeks from now", "end of week"), and month/day
+    with ordinals ("January 28th", "the 3rd of march", "Sept. 5, 2027").
+
+    Returns None if the phrase isn't recognised.
+    """
+    resolved = _parse_date_cached(_normalize(text), today or date.today())
+    return resolved.isoformat() if resolved else None
+
+
+@lru_cache(maxsize=256)
+def _parse_time_cached(phrase: str) -> Optional[str]:
+    if phrase in _TIME_WORDS:
+        return _TIME_WORDS[phrase]
+    match = _TIME_12H.match(phrase)
+    if match:
+        hour = int(match["hour"])
+        minute = int(match["minute"] or 0)
+        if not 1 <= hour <= 12 or minute > 59:
+            return None
+        hour = hour % 12 + (12 if match["meridiem"].startswith("p") else 0)
+        return f"{hour:02d}:{minute:02d}"
+    match = _TIME_24H.match(phrase)
+    if match:
+        hour = int(match["hour"])
+        minute = int(match["minute"] or 0)
+        if hour > 23 or minute > 59:
+            return None
+        if match["minute"] is None and hour in _BARE_PM_HOURS:
+            hour += 12
+        return f"{hour:02d}:{minute:02d}"
+    return None
+
+
+def parse_time(text: str) -> Optional[str]:
+    """
+    Parse a spoken time into 24-hour "HH:MM".
+
+    Understands "3pm", "3:30 p.m.", "3.30pm", "930am", "15:00", "1530",
+    "9 o'clock", "noon" and "midnight". A bare hour from 1 to 7 ("at 3") is
+    taken as pm. Returns None if the phrase isn't recognised.
+    """
+    phrase = _SPACES.sub(" ", text.strip().lower())
+    if phrase.startswith("at "):
+        phrase = phrase[3:]
+    return _parse_time_cached(phrase)
+
+
+def clear_caches() -> None:
+    """Drop memoized results (used by the microbenchmark)"""
+    _parse_date_cached.cache_clear()
+    _parse_time_cached.cache_clear()
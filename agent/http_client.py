@@ -0,0 +1,80 @@
+"""
+Otto Voice Agent - Shared HTTP Client
+One pooled httpx.AsyncClient per event loop, reused by every tool
+"""
+
+import os
+import asyncio
+import logging
+import httpx
+
+from cassette import http_transport
+
+logger = logging.getLogger("otto.http")
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Pool configuration (override via environment)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30.0"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10.0"))
+
+# One client per event loop: jobs running on thread executors each have their
+# own loop, and an httpx client must not be shared across loops
+_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_holders: dict[asyncio.AbstractEventLoop, int] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=HTTP_TIMEOUT,
+            limits=limits,
+            # Set when a cassette is recording or replaying (see cassette.py)
+            transport=http_transport(http2=HTTP2_AVAILABLE, limits=limits),
+        )
+        _clients[loop] = client
+        logger.info(
+            f"HTTP client ready (http2={HTTP2_AVAILABLE}, "
+            f"max_connections={HTTP_MAX_CONNECTIONS}, keepalive={HTTP_MAX_KEEPALIVE})"
+        )
+    return client
+
+
+def acquire_http_client() -> httpx.AsyncClient:
+    """Register a job as a user of the shared client (pair with release_http_client)."""
+    loop = asyncio.get_running_loop()
+    _holders[loop] = _holders.get(loop, 0) + 1
+    return get_http_client()
+
+
+async def release_http_client() -> None:
+    """Release a job's hold on the client; closes the pool when the last job on this loop ends."""
+    loop = asyncio.get_running_loop()
+    _holders[loop] = max(0, _holders.get(loop, 0) - 1)
+    if _holders[loop] == 0:
+        del _holders[loop]
+        await close_http_client()
+
+
+async def close_http_client() -> None:
+    """Close the running loop's client and its pooled connections."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("HTTP client closed")
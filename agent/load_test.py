@@ -0,0 +1,434 @@
+"""
+Otto Multi-Room Load Test
+Runs N concurrent agent sessions in one process. Each room is a real
+AgentSession running OttoAgent, built by main.create_session() like
+entrypoint() builds it, in a process prewarmed by main.prewarm(). A scripted
+stand-in for the realtime model answers each user turn with function calls,
+so tools go through the session's own dispatch, and the user_state_changed
+hook starts every turn's budget. Sessions run without room audio; 20 ms
+audio frames tick on the same event loop instead. The mock Next.js API runs
+in a separate process, so its CPU isn't counted against the agent.
+
+Reports, per room count: turn and tool latency percentiles, event-loop lag,
+CPU and memory per session, and the largest room count that stayed within
+the lag/latency targets (sessions per process).
+
+Run with: python load_test.py --rooms 1 10 25 50 --duration 30 --latency-ms 150
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import itertools
+import resource
+import subprocess
+import tempfile
+from array import array
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+# Add the agent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from livekit.agents import APIConnectOptions, llm
+from livekit.agents.llm import ChatChunk, ChoiceDelta, FunctionToolCall
+
+from mock_api import add_mock_arguments
+from metrics import registry
+from benchmark_tools import percentile
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# What users ask for, weighted roughly like real sessions (None = small talk, no tool)
+TURN_SCRIPT = [
+    (5, [("get_calendar_events", {"days_ahead": 1})]),
+    (4, [("get_unread_emails", {"max_count": 5})]),
+    (4, [("get_github_activity", {"days_back": 1})]),
+    (2, [("get_daily_briefing", {})]),
+    (2, [("get_calendar_events", {"days_ahead": 2}), ("create_calendar_event",
+         {"title": "Load test sync", "date": "tomorrow", "time": "3pm"})]),
+    (1, [("send_email", {"to": "load@example.com", "subject": "Load test", "body": "Hello from the load test"})]),
+    (4, None),
+]
+
+# 20 ms of 24 kHz mono 16-bit audio, like the realtime model's output frames
+FRAME_SECONDS = 0.02
+FRAME_SAMPLES = 480
+
+
+_call_ids = itertools.count()
+
+
+class ScriptedStream(llm.LLMStream):
+    """One model response: a think delay, then the scripted chunk"""
+
+    def __init__(self, model: "ScriptedRealtimeModel", delta: ChoiceDelta, **kwargs):
+        super().__init__(model, **kwargs)
+        self._delta = delta
+
+    async def _run(self) -> None:
+        await asyncio.sleep(self._llm.think_seconds())
+        if self._delta.tool_calls:
+            self._llm.calls_sent_at = time.perf_counter()
+        self._event_ch.send_nowait(ChatChunk(id=f"scripted-{next(_call_ids)}", delta=self._delta))
+
+
+class ScriptedRealtimeModel(llm.LLM):
+    """
+    Stand-in for the Gemini realtime model: after the user finishes speaking
+    it "thinks", emits the scripted function calls for the turn, and once
+    their outputs come back answers with them. The session speaks the answer
+    for a time proportional to its length.
+    """
+
+    def __init__(self, rng: random.Random, think_ms: float, chars_per_second: float, speed: float,
+                 tool_latencies: list[float]):
+        super().__init__()
+        self.rng = rng
+        self.think_ms = think_ms
+        self.chars_per_second = chars_per_second
+        self.speed = speed
+        self.tool_latencies = tool_latencies
+        self._weights = [weight for weight, _ in TURN_SCRIPT]
+        self._turns = [calls for _, calls in TURN_SCRIPT]
+        self.calls_sent_at: Optional[float] = None
+
+    def next_turn(self) -> list[tuple[str, dict]]:
+        return self.rng.choices(self._turns, weights=self._weights)[0] or []
+
+    def think_seconds(self) -> float:
+        return self.rng.uniform(0.5, 1.5) * self.think_ms / 1000 / self.speed
+
+    def speaking_seconds(self, reply: str) -> float:
+        return max(1.0, len(reply) / self.chars_per_second) / self.speed
+
+    def chat(self, *, chat_ctx, tools=None, conn_options=APIConnectOptions(), **kwargs) -> ScriptedStream:
+        last = chat_ctx.items[-1]
+        if last.type == "function_call_output":
+            # Dispatch, execution and output of the turn's tools, as the model sees it
+            if self.calls_sent_at is not None:
+                self.tool_latencies.append((time.perf_counter() - self.calls_sent_at) * 1000)
+                self.calls_sent_at = None
+            outputs = []
+            for item in reversed(chat_ctx.items):
+                if item.type != "function_call_output":
+                    break
+                outputs.append(item.output)
+            delta = ChoiceDelta(role="assistant", content="\n".join(reversed(outputs)))
+        else:
+            calls = [
+                FunctionToolCall(name=name, arguments=json.dumps(kwargs), call_id=f"call-{next(_call_ids)}")
+                for name, kwargs in self.next_turn()
+            ]
+            if calls:
+                delta = ChoiceDelta(role="assistant", tool_calls=calls)
+            else:
+                delta = ChoiceDelta(role="assistant", content="Sure, happy to help with that.")
+        return ScriptedStream(self, delta, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+@dataclass
+class StepReport:
+    rooms: int
+    seconds: float
+    turns: int
+    tool_calls: int
+    errors: int
+    turn_p50_ms: Optional[float]
+    turn_p95_ms: Optional[float]
+    tool_p50_ms: Optional[float]
+    tool_p95_ms: Optional[float]
+    tool_p99_ms: Optional[float]
+    lag_p50_ms: Optional[float]
+    lag_p99_ms: Optional[float]
+    lag_max_ms: Optional[float]
+    cpu_percent: float
+    cpu_ms_per_session_second: float
+    rss_mib: float
+    rss_growth_mib: float
+    rss_mib_per_session: float
+    within_targets: bool
+
+
+def rss_mib() -> float:
+    """Current resident set size (Linux), falling back to the peak elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+async def monitor_loop_lag(samples: list[float], stop: asyncio.Event, interval: float = 0.01):
+    """How late the loop wakes a 10 ms sleeper - the delay audio frames would see"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (time.perf_counter() - started - interval) * 1000))
+
+
+async def audio_frames(stop: asyncio.Event):
+    """Per-room frame pump: a level (RMS) computation every 20 ms"""
+    frame = array("h", (int(3000 * ((i % 48) / 24 - 1)) for i in range(FRAME_SAMPLES)))
+    next_tick = time.perf_counter()
+    while not stop.is_set():
+        sum(sample * sample for sample in frame)
+        next_tick += FRAME_SECONDS
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+
+async def run_room(
+    index: int,
+    args: argparse.Namespace,
+    stop: asyncio.Event,
+    vad,
+    latencies: dict[str, list[float]],
+    counters: dict,
+):
+    """One simulated room: an AgentSession set up as in entrypoint(), then scripted turns"""
+    import main as agent_main
+    import tools
+    from log_pipeline import bind_log_context
+
+    user_id = f"load-user-{index % args.users}"
+    bind_log_context(session_id=f"load-{index}", room=f"load-room-{index}")
+    tools.set_current_user_id(user_id)
+
+    rng = random.Random(index if args.seed is None else args.seed * 100003 + index)
+    model = ScriptedRealtimeModel(rng, args.think_ms, args.chars_per_second, args.speed, latencies["tool"])
+    session = agent_main.create_session(user_id, llm=model, vad=vad)
+    frames = asyncio.create_task(audio_frames(stop)) if args.audio else None
+
+    # Stagger joins so rooms don't move in lockstep
+    await asyncio.sleep(rng.uniform(0, 2.0) / args.speed)
+    await session.start(agent_main.OttoAgent())
+    try:
+        while not stop.is_set():
+            # User speaks; the VAD's speaking -> listening change fires the turn hook
+            await asyncio.sleep(rng.uniform(1.5, 4.0) / args.speed)
+            session._update_user_state("speaking")
+            session._update_user_state("listening")
+            counters["turns"] += 1
+
+            started = time.perf_counter()
+            reply = ""
+            try:
+                result = await session.run(user_input="What's new?")
+                for event in result.events:
+                    if event.type == "function_call_output":
+                        counters["tool_calls"] += 1
+                        counters["exceptions"] += event.item.is_error
+                    elif event.type == "message":
+                        reply = event.item.text_content or ""
+            except Exception:
+                counters["exceptions"] += 1
+            latencies["turn"].append((time.perf_counter() - started) * 1000)
+
+            await asyncio.sleep(model.speaking_seconds(reply))
+    finally:
+        if frames:
+            frames.cancel()
+        await session.aclose()
+
+
+async def run_step(rooms: int, args: argparse.Namespace, vad) -> StepReport:
+    """Run `rooms` concurrent sessions for args.duration seconds and measure the process"""
+    registry.reset()
+    stop = asyncio.Event()
+    lag: list[float] = []
+    latencies: dict[str, list[float]] = {"turn": [], "tool": []}
+    counters = {"turns": 0, "tool_calls": 0, "exceptions": 0}
+
+    rss_before = rss_mib()
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+
+    monitor = asyncio.create_task(monitor_loop_lag(lag, stop))
+    tasks = [asyncio.create_task(run_room(i, args, stop, vad, latencies, counters)) for i in range(rooms)]
+    await asyncio.sleep(args.duration)
+    stop.set()
+    # Let in-flight turns finish; rooms mid-speech are simply cancelled
+    await asyncio.wait(tasks, timeout=args.drain)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, monitor, return_exceptions=True)
+
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+    rss_after = rss_mib()
+    errors = counters["exceptions"] + sum(tool.get("errors", 0) for tool in registry.snapshot().values())
+
+    report = StepReport(
+        rooms=rooms,
+        seconds=elapsed,
+        turns=counters["turns"],
+        tool_calls=counters["tool_calls"],
+        errors=errors,
+        turn_p50_ms=percentile(latencies["turn"], 50),
+        turn_p95_ms=percentile(latencies["turn"], 95),
+        tool_p50_ms=percentile(latencies["tool"], 50),
+        tool_p95_ms=percentile(latencies["tool"], 95),
+        tool_p99_ms=percentile(latencies["tool"], 99),
+        lag_p50_ms=percentile(lag, 50),
+        lag_p99_ms=percentile(lag, 99),
+        lag_max_ms=max(lag) if lag else None,
+        cpu_percent=100 * cpu / elapsed,
+        cpu_ms_per_session_second=1000 * cpu / (elapsed * rooms),
+        rss_mib=rss_after,
+        rss_growth_mib=rss_after - rss_before,
+        rss_mib_per_session=(rss_after - rss_before) / rooms,
+        within_targets=False,
+    )
+    report.within_targets = (
+        (report.lag_p99_ms or 0.0) <= args.max_lag_ms
+        and (report.tool_p95_ms or 0.0) <= args.max_tool_p95_ms
+        and report.cpu_percent <= args.max_cpu_percent
+    )
+    return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_api(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    """Run mock_api.py in its own process and wait until it accepts connections"""
+    port = free_port()
+    command = [
+        sys.executable, os.path.join(AGENT_DIR, "mock_api.py"), "--port", str(port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--items", str(args.items), "--body-bytes", str(args.body_bytes),
+        "--error-rate", str(args.error_rate),
+    ]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Mock API did not start")
+
+
+class PrewarmedProcess:
+    """The part of JobProcess that main.prewarm() uses"""
+
+    def __init__(self):
+        self.userdata: dict = {}
+
+
+async def run_load_test(args: argparse.Namespace, api_url: str) -> list[StepReport]:
+    # tools reads API_URL at import time; keep load-test activity out of the real store
+    os.environ["API_URL"] = api_url
+    os.environ.setdefault("ACTIVITY_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="otto-load-"), "activity.db"))
+    import main as agent_main
+    import cache
+    from http_client import close_http_client
+
+    # Same per-process state a worker has after prewarm (VAD, plugins, optional clients)
+    proc = PrewarmedProcess()
+    agent_main.prewarm(proc)
+    # One throwaway session, so one-time framework setup isn't charged to the first step
+    warmup = agent_main.create_session(None, llm=ScriptedRealtimeModel(random.Random(0), 0, 1, 1, []), vad=proc.userdata["vad"])
+    await warmup.start(agent_main.OttoAgent())
+    await warmup.aclose()
+
+    reports = []
+    try:
+        for rooms in args.rooms:
+            if not args.keep_cache:
+                cache.response_cache.clear()
+            report = await run_step(rooms, args, proc.userdata["vad"])
+            reports.append(report)
+            print(f"  ✓ {rooms} rooms: turn p95 {report.turn_p95_ms or 0:.0f} ms, "
+                  f"loop lag p99 {report.lag_p99_ms or 0:.1f} ms, CPU {report.cpu_percent:.0f}%")
+    finally:
+        await close_http_client()
+    return reports
+
+
+def format_report(reports: list[StepReport], args: argparse.Namespace) -> str:
+    def ms(value: Optional[float]) -> str:
+        return f"{value:8.1f}" if value is not None else "       -"
+
+    lines = [
+        f"{'rooms':>5} {'turns':>6} {'calls':>6} {'errors':>6} {'turn p50':>8} {'turn p95':>8} "
+        f"{'tool p50':>8} {'tool p95':>8} {'tool p99':>8} {'lag p50':>8} {'lag p99':>8} {'lag max':>8} "
+        f"{'cpu %':>6} {'cpu ms/s':>8} {'rss MiB':>8} {'Δrss':>6} {'MiB/ses':>7} ok",
+    ]
+    for r in reports:
+        lines.append(
+            f"{r.rooms:5d} {r.turns:6d} {r.tool_calls:6d} {r.errors:6d} {ms(r.turn_p50_ms)} {ms(r.turn_p95_ms)} "
+            f"{ms(r.tool_p50_ms)} {ms(r.tool_p95_ms)} {ms(r.tool_p99_ms)} "
+            f"{ms(r.lag_p50_ms)} {ms(r.lag_p99_ms)} {ms(r.lag_max_ms)} "
+            f"{r.cpu_percent:6.1f} {r.cpu_ms_per_session_second:8.2f} {r.rss_mib:8.1f} {r.rss_growth_mib:+6.1f} "
+            f"{r.rss_mib_per_session:7.2f} {'✅' if r.within_targets else '❌'}"
+        )
+    sustained = [r.rooms for r in reports if r.within_targets]
+    lines.append("")
+    lines.append("cpu ms/s: CPU milliseconds per session per second; MiB/ses: memory growth per session")
+    lines.append(
+        f"Sessions per process within targets (lag p99 ≤ {args.max_lag_ms:.0f} ms, "
+        f"tool p95 ≤ {args.max_tool_p95_ms:.0f} ms, CPU ≤ {args.max_cpu_percent:.0f}%): "
+        f"{max(sustained) if sustained else 'none of the tested counts'}"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the agent with N concurrent sessions")
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="Room counts to step through")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per step")
+    parser.add_argument("--drain", type=float, default=5.0, help="Seconds to let in-flight turns finish")
+    parser.add_argument("--users", type=int, default=1000, help="Distinct user ids (rooms share users above this)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Compress conversational pauses by this factor")
+    parser.add_argument("--think-ms", type=float, default=600.0, help="Mean model latency before tool calls")
+    parser.add_argument("--chars-per-second", type=float, default=15.0, help="Speaking rate for replies")
+    parser.add_argument("--no-audio", dest="audio", action="store_false", help="Skip the 20 ms audio frame pump")
+    parser.add_argument("--keep-cache", action="store_true", help="Don't clear the response cache between steps")
+    parser.add_argument("--max-lag-ms", type=float, default=50.0, help="Event-loop lag p99 target")
+    parser.add_argument("--max-tool-p95-ms", type=float, default=2000.0, help="Tool round-trip p95 target (calls sent to outputs back)")
+    parser.add_argument("--max-cpu-percent", type=float, default=80.0, help="Process CPU target")
+    parser.add_argument("--json", dest="json_path", help="Also write results as JSON to this path")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("OTTO MULTI-ROOM LOAD TEST")
+    print(f"rooms={args.rooms} duration={args.duration}s speed={args.speed}x audio={'on' if args.audio else 'off'}")
+    print(f"mock: latency={args.latency_ms}±{args.jitter_ms}ms items={args.items} error_rate={args.error_rate}")
+    print("=" * 60)
+
+    process, api_url = start_mock_api(args)
+    try:
+        reports = asyncio.run(run_load_test(args, api_url))
+    finally:
+        process.terminate()
+        process.wait()
+
+    print()
+    print(format_report(reports, args))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "args": vars(args),
+                "results": [asdict(r) for r in reports],
+            }, f, indent=2)
+        print(f"\n📄 Results saved to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Otto Voice Agent - Logging Pipeline
+Records from the "otto.*" loggers are tagged with the session's correlation
+ids, sampled, and put on a queue; a background thread redacts, formats (JSON
+by default) and writes them, so no console I/O happens on the audio loop.
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+import re
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+# "json" for machine-parseable lines, "console" for the colored dev format
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Records queued beyond this are dropped (and counted) rather than blocking
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+
+def _parse_sample_rates(raw: str) -> dict[str, float]:
+    """"tool_result=0.1,cache=0.25" -> {"tool_result": 0.1, "cache": 0.25}"""
+    rates = {}
+    for pair in raw.split(","):
+        name, _, rate = pair.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+# Fraction of INFO/DEBUG records kept per event kind (unlisted kinds keep all)
+LOG_SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+# Field values never written as-is
+REDACTED_FIELDS = {"body", "snippet", "to", "attendees", "email"}
+_EMAIL_RE = re.compile(r"[\w.+-]+@([\w-]+\.[\w.-]+)")
+
+_log_context: ContextVar[dict] = ContextVar("otto_log_context", default={})
+
+
+def bind_log_context(**values) -> None:
+    """Attach correlation ids (session_id, user_id, ...) to every record from this task"""
+    _log_context.set({**_log_context.get(), **values})
+
+
+def log_event(logger: logging.Logger, event: str, message: str, level: int = logging.INFO, **fields) -> None:
+    """Log a structured record; `event` names the kind for sampling and parsing"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"event": event, "fields": fields})
+
+
+def redact(value):
+    """Mask email addresses (keeping the domain) in strings, recursively"""
+    if isinstance(value, str):
+        return _EMAIL_RE.sub(r"<redacted>@\1", value)
+    if isinstance(value, dict):
+        return {k: _redact_field(k, v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+def _redact_field(name: str, value):
+    if name in REDACTED_FIELDS and value:
+        if isinstance(value, (list, tuple)):
+            return f"<redacted {len(value)} items>"
+        return f"<redacted {len(str(value))} chars>"
+    return redact(value)
+
+
+class _ContextFilter(logging.Filter):
+    """Runs on the caller's thread: captures correlation ids and applies sampling"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        rate = LOG_SAMPLE_RATES.get(event) if event else None
+        if rate is not None and record.levelno < logging.WARNING and random.random() >= rate:
+            return False
+        record.context = _log_context.get()
+        return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: a full queue drops the record"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+        }
+        entry.update(getattr(record, "context", {}))
+        if getattr(record, "event", None):
+            entry["event"] = record.event
+        entry.update(redact(getattr(record, "fields", {})))
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__(
+            fmt="\033[36m%(asctime)s\033[0m | \033[33m%(levelname)s\033[0m | %(message)s",
+            datefmt="%H:%M:%S",
+        )
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        line = redact(line)
+        fields = redact(getattr(record, "fields", {}))
+        if fields:
+            extras = " ".join(f"{k}={v}" for k, v in fields.items() if v is not None)
+            line += f" \033[2m{extras}\033[0m"
+        return line
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+
+def setup_logging(fmt: str = LOG_FORMAT, level: str = LOG_LEVEL) -> None:
+    """
+    Route the "otto" logger tree through the queue (once per process). Other
+    loggers (livekit's) keep whatever handlers the framework configured.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _handler = _DroppingQueueHandler(log_queue)
+    _handler.addFilter(_ContextFilter())
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(ConsoleFormatter() if fmt == "console" else JsonFormatter())
+
+    otto = logging.getLogger("otto")
+    otto.setLevel(level)
+    otto.addHandler(_handler)
+    otto.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener, _handler
+    if _listener is None:
+        return
+    logging.getLogger("otto").removeHandler(_handler)
+    _listener.stop()
+    _listener = None
+    _handler = None
+    if _DroppingQueueHandler.dropped:
+        sys.stderr.write(f"otto logging: dropped {_DroppingQueueHandler.dropped} records (queue full)\n")
@@ -5,37 +5,77 @@ Using Google Gemini Live Realtime API
 
 import os
 import json
+import time
+import asyncio
+import logging
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
+# Load .env.local from project root (parent of agent directory) before the
+# agent modules below, which read their settings at import time
+project_root = Path(__file__).parent.parent
+env_file = project_root / ".env.local"
+if env_file.exists():
+    load_dotenv(env_file)
+else:
+    load_dotenv()
+
 from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobExecutorType,
+    JobProcess,
     WorkerOptions,
     cli,
 )
-from livekit.plugins import silero
-from livekit.plugins import google
 
 from prompts import AGENT_INSTRUCTION, SESSION_INSTRUCTION
 from tools import (
+    get_daily_briefing,
     get_github_activity,
     get_unread_emails,
     get_calendar_events,
     create_calendar_event,
     send_email,
     search_web,
+    lookup_recent_results,
     set_current_user_id,
+    SessionData,
+    prefetch_briefing,
 )
+from http_client import acquire_http_client, release_http_client
+from metrics import flush_metrics_dump, start_metrics_dump, start_metrics_server
+from activity_store import start_ingest_server
+from budget import start_turn
+from ttc_compression import get_client as get_ttc_client
+from log_pipeline import bind_log_context, log_event, setup_logging
 
-# Load .env.local from project root (parent of agent directory)
-project_root = Path(__file__).parent.parent
-env_file = project_root / ".env.local"
-if env_file.exists():
-    load_dotenv(env_file)
-else:
-    load_dotenv()
+# Queued JSON logs for the otto.* loggers (LOG_FORMAT=console for colored dev output).
+# Runs at import so spawned job processes get their own writer thread too.
+setup_logging()
+logger = logging.getLogger("otto.worker")
+
+# Opt-in: warm GitHub/Gmail/Calendar data while the greeting is spoken
+PREFETCH_ON_START = os.getenv("PREFETCH_ON_START", "false").lower() in ("1", "true", "yes")
+
+# "thread" hosts many rooms per worker process; user context is per session either way
+JOB_EXECUTOR = os.getenv("AGENT_JOB_EXECUTOR", "process").lower()
+
+
+def load_plugins():
+    """
+    Import the heavy LiveKit plugins on first use rather than at module load,
+    so processes that never run a job (the worker supervisor) skip them.
+    """
+    from livekit.plugins import google, silero
+    return google, silero
+
+
+# Plugins must register on the main thread; thread-executor jobs can't import them later
+if JOB_EXECUTOR == "thread":
+    load_plugins()
 
 
 class OttoAgent(Agent):
@@ -45,25 +85,73 @@ class OttoAgent(Agent):
         super().__init__(
             instructions=AGENT_INSTRUCTION,
             tools=[
+                get_daily_briefing,
                 get_github_activity,
                 get_unread_emails,
                 get_calendar_events,
                 create_calendar_event,
                 send_email,
                 search_web,
+                lookup_recent_results,
             ],
         )
 
 
+def create_session(user_id: Optional[str], llm, vad=None) -> AgentSession:
+    """An agent session for one user, with the turn hook that resets the tool budget"""
+    session = AgentSession(
+        userdata=SessionData(user_id=user_id, turn_events=True),
+        llm=llm,
+        vad=vad,
+    )
+
+    # Each user turn gets a fresh latency budget shared by the tools that answer it
+    @session.on("user_state_changed")
+    def _on_user_state_changed(ev):
+        if ev.old_state == "speaking" and ev.new_state == "listening":
+            start_turn(session.userdata)
+
+    return session
+
+
+def prewarm(proc: JobProcess):
+    """Load the VAD model once per worker process, before any job is assigned"""
+    started = time.perf_counter()
+    _, silero = load_plugins()
+    plugins_loaded = time.perf_counter()
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["jobs_started"] = 0
+    # Pull in optional tokenc now too, instead of on the first large tool result
+    get_ttc_client()
+    log_event(
+        logger, "prewarm", "🔥 Prewarmed",
+        total_ms=round((time.perf_counter() - started) * 1000),
+        plugins_ms=round((plugins_loaded - started) * 1000),
+        vad_ms=round((time.perf_counter() - plugins_loaded) * 1000),
+    )
+
+
 async def entrypoint(ctx: JobContext):
     """Main entrypoint for the agent"""
+    job_started = time.perf_counter()
+    # Correlation ids for every log record from this job's tasks
+    bind_log_context(session_id=ctx.job.id, room=ctx.job.room.name)
     await ctx.connect()
 
+    # Feed this process's tool metrics to the worker's exporter (no-op without METRICS_PORT)
+    start_metrics_dump(ctx.job.id)
+    ctx.add_shutdown_callback(flush_metrics_dump)
+    start_ingest_server()
+
+    # Share the pooled HTTP client across tool calls; closed when the last job ends
+    acquire_http_client()
+    ctx.add_shutdown_callback(release_http_client)
+
     # Get the user who connected (for API authentication)
     user_id = None
     for participant in ctx.room.remote_participants.values():
         user_id = participant.identity
-        print(f"\n🔑 Connected user: {user_id}")
+        logger.info(f"🔑 Connected user: {user_id}")
 
         # Try to get from metadata if available
         if participant.metadata:
@@ -71,23 +159,37 @@ async def entrypoint(ctx: JobContext):
                 metadata = json.loads(participant.metadata)
                 if "user_id" in metadata:
                     user_id = metadata["user_id"]
-                    print(f"📋 User ID from metadata: {user_id}")
+                    logger.info(f"📋 User ID from metadata: {user_id}")
             except json.JSONDecodeError:
                 pass
         break
 
     # Set the user ID for tools to use
+    prefetch_task = None
     if user_id:
         set_current_user_id(user_id)
+        if PREFETCH_ON_START:
+            prefetch_task = asyncio.create_task(prefetch_briefing(user_id))
     else:
-        print("⚠️ No user ID found - APIs will require login")
+        logger.warning("⚠️ No user ID found - APIs will require login")
+
+    google, silero = load_plugins()
+
+    # VAD comes from prewarm; load it here only if this process wasn't prewarmed
+    vad = ctx.proc.userdata.get("vad")
+    warm = vad is not None
+    if vad is None:
+        vad = silero.VAD.load()
+        ctx.proc.userdata["vad"] = vad
+    ctx.proc.userdata["jobs_started"] = ctx.proc.userdata.get("jobs_started", 0) + 1
 
     # Use Google Gemini Realtime API
-    session = AgentSession(
+    session = create_session(
+        user_id,
         llm=google.realtime.RealtimeModel(
             model="gemini-2.5-flash-native-audio-preview-09-2025",
         ),
-        vad=silero.VAD.load(),
+        vad=vad,
     )
 
     await session.start(
@@ -95,15 +197,32 @@ async def entrypoint(ctx: JobContext):
         agent=OttoAgent(),
     )
 
+    start_kind = "warm" if warm else "cold"
+    log_event(
+        logger, "job_ready", f"⏱️ Job ready ({start_kind} start)",
+        ready_ms=round((time.perf_counter() - job_started) * 1000),
+        start=start_kind,
+        job_number=ctx.proc.userdata["jobs_started"],
+    )
+
     # Greet the user
     await session.generate_reply(
         instructions=SESSION_INSTRUCTION,
     )
 
+    if prefetch_task:
+        await prefetch_task
+
 
 if __name__ == "__main__":
+    # One exporter per worker, summing every job process's metrics
+    start_metrics_server()
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            job_executor_type=(
+                JobExecutorType.THREAD if JOB_EXECUTOR == "thread" else JobExecutorType.PROCESS
+            ),
         )
     )
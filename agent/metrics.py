@@ -0,0 +1,394 @@
+"""
+Otto Voice Agent - Tool Metrics
+Per-call spans aggregated into histograms, served Prometheus-style.
+Job processes dump their registry to METRICS_DIR; the worker's exporter
+serves the sum of every process's numbers.
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import functools
+import threading
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+logger = logging.getLogger("otto.metrics")
+
+# Local metrics endpoint (disabled unless METRICS_PORT is set)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Where each process writes its registry (<pid>.json), and how often
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(tempfile.gettempdir(), "otto-metrics"))
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "10"))
+
+# Recent samples kept per histogram for percentile estimates
+SAMPLE_WINDOW = 1024
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+RATIO_BUCKETS = (1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+
+@dataclass
+class ToolSpan:
+    """Everything measured during a single tool call"""
+    tool: str
+    started: float = field(default_factory=time.perf_counter)
+    ended: Optional[float] = None
+    http_ms: float = 0.0
+    http_calls: int = 0
+    status_code: Optional[int] = None
+    payload_bytes: int = 0
+    compression_ratio: Optional[float] = None
+    compression_ms: Optional[float] = None
+    cache: Optional[str] = None  # "hit", "stale" or "miss"
+    coalesced: bool = False
+    error: bool = False
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.ended if self.ended is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+
+_current_span: ContextVar[Optional[ToolSpan]] = ContextVar("otto_tool_span", default=None)
+_span_sink: ContextVar[Optional[list]] = ContextVar("otto_span_sink", default=None)
+
+
+def current_span() -> Optional[ToolSpan]:
+    """The span of the tool call running in this task, if it is still open."""
+    span = _current_span.get()
+    if span is None or span.ended is not None:
+        return None
+    return span
+
+
+def collect_spans() -> list[ToolSpan]:
+    """Start collecting the spans of tool calls finished in this task; returns the list they land in"""
+    sink: list[ToolSpan] = []
+    _span_sink.set(sink)
+    return sink
+
+
+class Histogram:
+    """Cumulative buckets (for Prometheus) plus a window of recent samples (for percentiles)"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.samples: deque = deque(maxlen=SAMPLE_WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": list(self.buckets),
+            "bucket_counts": self.bucket_counts,
+            "count": self.count,
+            "total": self.total,
+            "samples": list(self.samples),
+        }
+
+    def merge(self, data: dict) -> None:
+        """Add another histogram's counts (from to_dict) to this one"""
+        self.bucket_counts = [a + b for a, b in zip(self.bucket_counts, data["bucket_counts"])]
+        self.count += data["count"]
+        self.total += data["total"]
+        self.samples.extend(data["samples"])
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """Aggregates finished spans per tool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.counters: dict[tuple[str, str], int] = {}
+
+    def _observe(self, tool: str, name: str, buckets: tuple, value: float) -> None:
+        key = (tool, name)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(buckets)
+        self.histograms[key].observe(value)
+
+    def _count(self, tool: str, name: str) -> None:
+        key = (tool, name)
+        self.counters[key] = self.counters.get(key, 0) + 1
+
+    def record(self, span: ToolSpan) -> None:
+        with self._lock:
+            self._count(span.tool, "calls")
+            if span.error:
+                self._count(span.tool, "errors")
+            if span.cache:
+                self._count(span.tool, f"cache_{span.cache}")
+            if span.coalesced:
+                self._count(span.tool, "coalesced")
+            if span.status_code is not None:
+                self._count(span.tool, f"status_{span.status_code}")
+            self._observe(span.tool, "latency_ms", LATENCY_BUCKETS_MS, span.duration_ms)
+            if span.http_calls:
+                self._observe(span.tool, "http_latency_ms", LATENCY_BUCKETS_MS, span.http_ms)
+                self._observe(span.tool, "payload_bytes", BYTES_BUCKETS, span.payload_bytes)
+            if span.compression_ms is not None:
+                self._observe(span.tool, "compression_ms", LATENCY_BUCKETS_MS, span.compression_ms)
+            if span.compression_ratio is not None:
+                self._observe(span.tool, "compression_ratio", RATIO_BUCKETS, span.compression_ratio)
+
+    def snapshot(self) -> dict:
+        """JSON-friendly view: counters and percentile summaries per tool"""
+        with self._lock:
+            tools: dict[str, dict] = {}
+            for (tool, name), value in self.counters.items():
+                tools.setdefault(tool, {})[name] = value
+            for (tool, name), histogram in self.histograms.items():
+                tools.setdefault(tool, {})[name] = histogram.summary()
+            return tools
+
+    def dump(self) -> dict:
+        """JSON-friendly raw counts, for merging into another registry"""
+        with self._lock:
+            return {
+                "counters": [[tool, name, value] for (tool, name), value in self.counters.items()],
+                "histograms": [[tool, name, h.to_dict()] for (tool, name), h in self.histograms.items()],
+            }
+
+    def merge(self, data: dict) -> None:
+        with self._lock:
+            for tool, name, value in data.get("counters", []):
+                self.counters[(tool, name)] = self.counters.get((tool, name), 0) + value
+            for tool, name, histogram in data.get("histograms", []):
+                key = (tool, name)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(tuple(histogram["buckets"]))
+                self.histograms[key].merge(histogram)
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for (tool, name), value in sorted(self.counters.items()):
+                lines.append(f'otto_tool_{name}_total{{tool="{tool}"}} {value}')
+            for (tool, name), histogram in sorted(self.histograms.items()):
+                metric = f"otto_tool_{name}"
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    lines.append(f'{metric}_bucket{{tool="{tool}",le="{bound}"}} {count}')
+                lines.append(f'{metric}_bucket{{tool="{tool}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{tool="{tool}"}} {histogram.total}')
+                lines.append(f'{metric}_count{{tool="{tool}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+registry = MetricsRegistry()
+
+
+def instrument_tool(func):
+    """Wrap a tool coroutine in a span that is recorded when it returns"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        span = ToolSpan(tool=func.__name__)
+        token = _current_span.set(span)
+        try:
+            return await func(*args, **kwargs)
+        except BaseException:
+            span.error = True
+            raise
+        finally:
+            span.ended = time.perf_counter()
+            _current_span.reset(token)
+            registry.record(span)
+            sink = _span_sink.get()
+            if sink is not None:
+                sink.append(span)
+    return wrapper
+
+
+def record_http(status_code: Optional[int], payload_bytes: int, elapsed_ms: float) -> None:
+    """Attach an upstream HTTP exchange to the current span"""
+    span = current_span()
+    if span is None:
+        return
+    span.http_calls += 1
+    span.http_ms += elapsed_ms
+    span.payload_bytes += payload_bytes
+    if status_code is not None:
+        span.status_code = status_code
+        if status_code >= 400:
+            span.error = True
+    else:
+        span.error = True
+
+
+def record_cache(outcome: str) -> None:
+    """Mark the current span as a cache hit, stale hit or miss"""
+    span = current_span()
+    if span is not None:
+        span.cache = outcome
+
+
+def record_coalesced() -> None:
+    """Mark the current span as served by another caller's in-flight request"""
+    span = current_span()
+    if span is not None:
+        span.coalesced = True
+
+
+def record_compression(original_chars: int, compressed_chars: int, elapsed_ms: float) -> None:
+    """Attach a compression result to the current span"""
+    span = current_span()
+    if span is None:
+        return
+    span.compression_ms = elapsed_ms
+    span.compression_ratio = original_chars / compressed_chars if compressed_chars else 1.0
+
+
+_dump_jobs: list[str] = []
+_dump_thread: Optional[threading.Thread] = None
+
+
+def _dump_path(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"{pid}.json")
+
+
+def write_metrics_dump() -> None:
+    """Write this process's registry, tagged with its pid and jobs, for the exporter"""
+    data = {"pid": os.getpid(), "jobs": list(_dump_jobs), "updated_at": time.time(), **registry.dump()}
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = _dump_path(os.getpid())
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+def start_metrics_dump(job_id: str) -> None:
+    """Tag this process's dumps with a job and write them every METRICS_DUMP_INTERVAL (thread started once per process)"""
+    global _dump_thread
+    _dump_jobs.append(job_id)
+    if _dump_thread is not None or not METRICS_PORT:
+        return
+
+    def run():
+        while True:
+            time.sleep(METRICS_DUMP_INTERVAL)
+            try:
+                write_metrics_dump()
+            except OSError as e:
+                logger.warning(f"Metrics dump failed: {e}")
+
+    _dump_thread = threading.Thread(target=run, name="otto-metrics-dump", daemon=True)
+    _dump_thread.start()
+
+
+async def flush_metrics_dump() -> None:
+    """Final dump when a job ends, so its last calls aren't lost with the process"""
+    if not METRICS_PORT:
+        return
+    try:
+        write_metrics_dump()
+    except OSError as e:
+        logger.warning(f"Metrics dump failed: {e}")
+
+
+def worker_registry() -> MetricsRegistry:
+    """
+    This process's registry plus the latest dump of every other process.
+    Dumps of finished job processes stay in, so counters cover the worker's lifetime.
+    """
+    merged = MetricsRegistry()
+    merged.merge(registry.dump())
+    try:
+        names = os.listdir(METRICS_DIR)
+    except OSError:
+        names = []
+    for name in names:
+        if not name.endswith(".json") or name == f"{os.getpid()}.json":
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                merged.merge(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping metrics dump {name}: {e}")
+    return merged
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = worker_registry().prometheus().encode()
+            content_type = "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body = json.dumps(worker_registry().snapshot(), indent=2).encode()
+            content_type = "application/json"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int = METRICS_PORT) -> None:
+    """
+    Serve the worker's /metrics and /metrics.json on a daemon thread. Runs in
+    the worker supervisor, which clears dumps left by a previous run.
+    """
+    global _server
+    if _server is not None or not port:
+        return
+    try:
+        for name in os.listdir(METRICS_DIR):
+            if name.endswith(".json"):
+                os.remove(os.path.join(METRICS_DIR, name))
+    except OSError:
+        pass
+    try:
+        _server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Metrics server not started on port {port}: {e}")
+        return
+    threading.Thread(target=_server.serve_forever, name="otto-metrics", daemon=True).start()
+    logger.info(f"Metrics available at http://127.0.0.1:{port}/metrics")
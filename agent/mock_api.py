@@ -0,0 +1,247 @@
+"""
+Otto Mock API - Local stand-in for the Next.js routes the agent calls
+Serves /api/github, /api/gmail, /api/calendar and /api/gmail/send with
+configurable latency, payload size and error rate. Used by the benchmarks.
+
+Run standalone with: python mock_api.py --port 3999 --latency-ms 150
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 100.0
+    jitter_ms: float = 20.0
+    items: int = 10
+    body_bytes: int = 0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+def _padding(config: MockConfig) -> str:
+    return "x" * config.body_bytes
+
+
+def github_payload(config: MockConfig, params: dict) -> dict:
+    now = datetime.now().astimezone()
+    since = datetime.fromisoformat(params["since"][0]) if "since" in params else None
+    repo = params.get("repo", ["otto"])[0]
+    repo = repo if "/" in repo else f"acme/{repo}"
+    events = []
+    for i in range(config.items):
+        event_type = "commit" if i % 3 else "pull_request"
+        date = now - timedelta(minutes=17 * i)
+        if since is not None and date <= since:
+            continue
+        events.append({
+            "id": f"{repo}@{i:040x}" if event_type == "commit" else f"{repo}#{i}",
+            "event_type": event_type,
+            "actor": f"dev{i % 4}",
+            "title": f"Change number {i} to the service",
+            "date": date.isoformat(),
+            "state": "open" if event_type == "pull_request" else None,
+            "repo": repo,
+            "body": _padding(config),
+        })
+    return {"events": events, "connected": True}
+
+
+def gmail_payload(config: MockConfig, params: dict) -> dict:
+    limit = min(int(params.get("limit", ["10"])[0]), 20)
+    now = datetime.now()
+    messages = []
+    for i in range(min(limit, config.items)):
+        messages.append({
+            "id": f"msg-{i}",
+            "from": f"Sender {i}",
+            "email": f"sender{i}@example.com",
+            "subject": f"Update {i} on the project",
+            "snippet": _padding(config)[:200],
+            "date": (now - timedelta(hours=i)).strftime("%a, %d %b %Y %H:%M:%S"),
+            "timeAgo": f"{i}h ago",
+            "unread": i % 2 == 0,
+        })
+    events = [
+        {"id": m["id"], "actor": m["from"], "email": m["email"], "title": m["subject"], "date": m["date"], "unread": m["unread"]}
+        for m in messages
+    ]
+    return {"messages": messages, "events": events, "connected": True}
+
+
+def calendar_payload(config: MockConfig, params: dict) -> dict:
+    """Events every hour from now, filtered to the start/end window and capped at limit"""
+    now = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+    window_start = datetime.fromisoformat(params["start"][0]) if "start" in params else now
+    window_end = datetime.fromisoformat(params["end"][0]) if "end" in params else now + timedelta(days=7)
+    limit = min(int(params.get("limit", ["10"])[0]), 50)
+    events = []
+    for i in range(config.items):
+        start = now + timedelta(hours=i + 1)
+        if not window_start <= start <= window_end:
+            continue
+        events.append({
+            "id": f"evt-{i}",
+            "title": f"Meeting {i}",
+            "time": start.strftime("%I:%M %p"),
+            "date": start.strftime("%a, %b %d"),
+            "description": _padding(config) or "No description",
+            "start": start.isoformat(),
+            "location": None,
+            "isToday": start.date() == now.date(),
+        })
+    return {
+        "events": events[:limit],
+        "window": {"start": window_start.isoformat(), "end": window_end.isoformat()},
+        "truncated": len(events) > limit,
+        "connected": True,
+    }
+
+
+def project_fields(payload: dict, params: dict) -> dict:
+    """Mirror the routes' ?fields= projection: keep the named keys of each event"""
+    if "fields" not in params:
+        return payload
+    fields = [f.strip() for f in params["fields"][0].split(",") if f.strip()]
+    projected = {key: value for key, value in payload.items() if key != "messages"}
+    projected["events"] = [
+        {field: event[field] for field in fields if field in event}
+        for event in payload.get("events", [])
+    ]
+    return projected
+
+
+GET_ROUTES = {
+    "/api/github": github_payload,
+    "/api/gmail": gmail_payload,
+    "/api/calendar": calendar_payload,
+}
+POST_ROUTES = {"/api/calendar", "/api/gmail/send"}
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real Next.js server
+    config: MockConfig = MockConfig()
+    rng: random.Random = random.Random()
+
+    def _delay(self):
+        latency = self.config.latency_ms + self.rng.uniform(-1, 1) * self.config.jitter_ms
+        time.sleep(max(0.0, latency) / 1000)
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fail(self) -> bool:
+        if self.config.error_rate and self.rng.random() < self.config.error_rate:
+            self._send_json(500, {"error": "Mock upstream failure"})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        route = GET_ROUTES.get(url.path)
+        self._delay()
+        if route is None:
+            self._send_json(404, {"error": "Not found"})
+        elif not self._fail():
+            params = parse_qs(url.query)
+            self._send_json(200, project_fields(route(self.config, params), params))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", "0"))
+        if length:
+            self.rfile.read(length)
+        self._delay()
+        if url.path not in POST_ROUTES:
+            self._send_json(404, {"error": "Not found"})
+        elif not self._fail():
+            self._send_json(201, {"success": True})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockAPIServer:
+    """Threaded mock server; use as a context manager or call start()/stop()"""
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        handler = type("ConfiguredMockAPIHandler", (MockAPIHandler,), {
+            "config": self.config,
+            "rng": random.Random(self.config.seed),
+        })
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockAPIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="otto-mock-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Shared CLI flags for scripts that start a mock API"""
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Uniform latency jitter (+/-)")
+    parser.add_argument("--items", type=int, default=10, help="Items per list response")
+    parser.add_argument("--body-bytes", type=int, default=0, help="Padding bytes per item")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 500 responses")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for jitter/errors")
+
+
+def mock_config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        items=args.items,
+        body_bytes=args.body_bytes,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Otto mock API")
+    parser.add_argument("--port", type=int, default=3999)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    server = MockAPIServer(mock_config_from_args(args), port=args.port)
+    print(f"🧪 Mock API listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
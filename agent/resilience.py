@@ -0,0 +1,138 @@
+"""
+Otto Voice Agent - Circuit Breakers and Retries
+Per-endpoint breakers shared by every session in the process, plus
+jittered exponential backoff for idempotent requests.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger("otto.resilience")
+
+# Consecutive failures that open a breaker, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30.0"))
+
+# Extra attempts for idempotent GETs, and the backoff base/cap in seconds
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.2"))
+RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "2.0"))
+
+# Upstream statuses worth retrying / counting against the breaker
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose breaker is open"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint} (retry in {retry_in:.0f}s)")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed: calls flow, consecutive failures are counted.
+    Open: calls fail fast until the reset timeout passes.
+    Half-open: a single probe is let through; success closes, failure reopens.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = BREAKER_RESET_SECONDS,
+    ):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            log = logger.warning if state == OPEN else logger.info
+            log(f"Circuit {self.endpoint}: {self.state} -> {state} (failures={self.failures})")
+            self.state = state
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless this call may go upstream"""
+        with self._lock:
+            if self.state == OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.reset_seconds:
+                    raise CircuitOpenError(self.endpoint, self.reset_seconds - elapsed)
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(self.endpoint, 0.0)
+                self._probing = True
+
+    def raise_if_open(self) -> None:
+        """Raise CircuitOpenError if the breaker is open, without claiming a probe"""
+        with self._lock:
+            if self.state == OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.reset_seconds:
+                    raise CircuitOpenError(self.endpoint, self.reset_seconds - elapsed)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._transition(CLOSED)
+
+    def record_cancelled(self) -> None:
+        """A call was abandoned mid-flight - free the probe slot without judging the endpoint"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(endpoint: str) -> CircuitBreaker:
+    """The process-wide breaker for an endpoint"""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def breaker_states() -> dict[str, str]:
+    """Current state of every endpoint's breaker"""
+    with _breakers_lock:
+        return {endpoint: breaker.state for endpoint, breaker in _breakers.items()}
+
+
+def retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (1-based)"""
+    ceiling = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+def is_retryable(status_code: Optional[int]) -> bool:
+    """Transport errors (no status) and overload/5xx responses"""
+    return status_code is None or status_code in RETRYABLE_STATUSES
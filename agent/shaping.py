@@ -0,0 +1,120 @@
+"""
+Otto Voice Agent - Result Shaping
+Ranks a tool's items and keeps the best ones that fit the tool's token budget,
+so what the realtime model reads stays bounded however busy the sources are.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+# Most tokens each tool's result may put in front of the model
+TOKEN_BUDGETS = {
+    "get_github_activity": int(os.getenv("TOKEN_BUDGET_GITHUB", "200")),
+    "get_unread_emails": int(os.getenv("TOKEN_BUDGET_EMAIL", "160")),
+    "get_calendar_events": int(os.getenv("TOKEN_BUDGET_CALENDAR", "160")),
+    "search_web": int(os.getenv("TOKEN_BUDGET_SEARCH", "240")),
+}
+DEFAULT_TOKEN_BUDGET = 200
+
+# Results above this are worth a compression round-trip
+COMPRESS_MIN_TOKENS = int(os.getenv("COMPRESS_MIN_TOKENS", "125"))
+
+# An item is only cut to fit if at least this much of it would survive
+MIN_PARTIAL_TOKENS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough estimate: ~4 chars per token (same heuristic as lib/compression.ts)"""
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut text to about `tokens` tokens at a word boundary"""
+    limit = tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 3].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "..."
+
+
+def recency_score(age_seconds: float, half_life: float) -> float:
+    """1.0 for brand new, halving every `half_life` seconds"""
+    return 0.5 ** (max(age_seconds, 0.0) / half_life)
+
+
+@dataclass
+class ResultItem:
+    text: str
+    score: float = 0.0  # higher is kept first
+    truncatable: bool = False  # may be shortened instead of dropped
+    ref: Any = None  # the caller's record behind the line, handed back if kept
+
+
+@dataclass
+class Section:
+    heading: Optional[str]
+    items: list[ResultItem] = field(default_factory=list)
+    more: str = "  ...and {count} more"
+
+
+def shape_result(tool: str, sections: list[Section], budget: Optional[int] = None) -> tuple[str, list[ResultItem]]:
+    """
+    Keep the highest-scoring items that fit the tool's token budget, then
+    render them in their original order under their section headings, noting
+    how many were left out. Returns the text and the kept items in the order
+    they appear in it.
+    """
+    budget = budget if budget is not None else TOKEN_BUDGETS.get(tool, DEFAULT_TOKEN_BUDGET)
+
+    ranked = sorted(
+        ((section_index, item_index, item)
+         for section_index, section in enumerate(sections)
+         for item_index, item in enumerate(section.items)),
+        key=lambda entry: entry[2].score,
+        reverse=True,
+    )
+
+    # Every non-empty section keeps its heading (it carries the total count),
+    # and room for an "...and N more" line in case it gets cut
+    used = sum(
+        estimate_tokens(section.heading or "") + estimate_tokens(section.more) + 2
+        for section in sections if section.items
+    )
+    # Shortenable items (search snippets) share what's left evenly, so one long
+    # item can't crowd out the rest
+    truncatable = sum(1 for _, _, item in ranked if item.truncatable)
+    share = (budget - used) // truncatable - 1 if truncatable else 0
+
+    kept: dict[tuple[int, int], str] = {}
+    for section_index, item_index, item in ranked:
+        remaining = budget - used
+        text = item.text
+        if item.truncatable and share >= MIN_PARTIAL_TOKENS:
+            text = truncate_to_tokens(text, share)
+        cost = estimate_tokens(text) + 1
+        if cost > remaining:
+            if not item.truncatable or remaining - 1 < MIN_PARTIAL_TOKENS:
+                continue
+            text = truncate_to_tokens(text, remaining - 1)
+            cost = estimate_tokens(text) + 1
+        used += cost
+        kept[(section_index, item_index)] = text
+
+    lines = []
+    shown_items = []
+    for section_index, section in enumerate(sections):
+        if not section.items:
+            continue
+        if section.heading:
+            lines.append(section.heading)
+        shown = 0
+        for item_index in range(len(section.items)):
+            text = kept.get((section_index, item_index))
+            if text is not None:
+                lines.append(text)
+                shown_items.append(section.items[item_index])
+                shown += 1
+        if shown < len(section.items):
+            lines.append(section.more.format(count=len(section.items) - shown))
+    return "\n".join(lines), shown_items
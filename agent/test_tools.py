@@ -6,7 +6,7 @@ Run this to test all 6 tools and save output to test_results.txt
 import asyncio
 import os
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime, date
 
 # Add the agent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -21,6 +21,7 @@ async def test_all_tools():
     """Test all tools and save output to file"""
     import httpx
     from duckduckgo_search import DDGS
+    from date_parsing import parse_date, parse_time
     
     results = []
     results.append("=" * 60)
@@ -106,34 +107,22 @@ async def test_all_tools():
     results.append("-" * 40)
     results.append("TEST 4: Date Parsing Logic")
     results.append("-" * 40)
+    # Fixed reference day so the expected values stay deterministic
+    reference = date(2026, 1, 18)
     test_dates = [
-        ("today", datetime.now().strftime("%Y-%m-%d")),
-        ("tomorrow", (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")),
+        ("today", "2026-01-18"),
+        ("tomorrow", "2026-01-19"),
         ("January 28th", "2026-01-28"),
         ("Feb 15", "2026-02-15"),
         ("September 28", "2026-09-28"),
+        ("August 1st", "2026-08-01"),
+        ("next Monday", "2026-01-19"),
+        ("in 3 days", "2026-01-21"),
+        ("end of week", "2026-01-23"),
     ]
     all_pass = True
     for input_date, expected in test_dates:
-        # Parse logic from tools.py
-        date_lower = input_date.lower().strip()
-        if date_lower == "today":
-            parsed = datetime.now().strftime("%Y-%m-%d")
-        elif date_lower == "tomorrow":
-            parsed = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        else:
-            clean_date = date_lower.replace("st", "").replace("nd", "").replace("rd", "").replace("th", "").strip()
-            try:
-                parsed_date = datetime.strptime(clean_date, "%B %d")
-                parsed_date = parsed_date.replace(year=2026)
-                parsed = parsed_date.strftime("%Y-%m-%d")
-            except:
-                try:
-                    parsed_date = datetime.strptime(clean_date, "%b %d")
-                    parsed_date = parsed_date.replace(year=2026)
-                    parsed = parsed_date.strftime("%Y-%m-%d")
-                except:
-                    parsed = input_date
+        parsed = parse_date(input_date, today=reference) or input_date
         
         status = "✅" if parsed == expected else "❌"
         if parsed != expected:
@@ -153,20 +142,18 @@ async def test_all_tools():
         ("3:30pm", "15:30"),
         ("9:15am", "09:15"),
         ("11pm", "23:00"),
+        ("15:45", "15:45"),
+        ("noon", "12:00"),
+        ("930am", "09:30"),
+        ("1130pm", "23:30"),
+        ("3.30pm", "15:30"),
+        ("at 3", "15:00"),
+        ("9 o'clock", "09:00"),
+        ("12", "12:00"),
     ]
     all_pass = True
     for input_time, expected in test_times:
-        time_lower = input_time.lower().strip().replace(" ", "")
-        parsed = input_time
-        if "pm" in time_lower or "am" in time_lower:
-            time_formats = ["%I%p", "%I:%M%p", "%I:00%p"]
-            for fmt in time_formats:
-                try:
-                    parsed_time = datetime.strptime(time_lower, fmt)
-                    parsed = parsed_time.strftime("%H:%M")
-                    break
-                except:
-                    continue
+        parsed = parse_time(input_time) or input_time
         
         status = "✅" if parsed == expected else "❌"
         if parsed != expected:
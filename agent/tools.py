@@ -4,56 +4,602 @@ These tools connect to the Next.js API to fetch user data
 """
 
 import os
+import time
+import asyncio
 import logging
 import httpx
-from datetime import datetime, timedelta
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
 from livekit.agents import function_tool, RunContext
-from duckduckgo_search import DDGS
 from ttc_compression import compress_text
+from shaping import COMPRESS_MIN_TOKENS, ResultItem, Section, estimate_tokens, recency_score, shape_result
+from http_client import get_http_client
+from cassette import get_cassette
+from activity_store import get_activity_store, run_in_store_thread
+from cache import last_answered, last_items, response_cache
+from working_set import MAX_MATCHES, SOURCES, WorkingItem, WorkingSet, activate_items
+from date_parsing import parse_date, parse_time
+from budget import MIN_CALL_SECONDS, TurnBudget, budget_timeout, current_budget, with_turn_budget
+from resilience import HTTP_RETRIES, CircuitBreaker, CircuitOpenError, breaker_for, breaker_states, is_retryable, retry_delay
+from metrics import instrument_tool, record_http, record_coalesced, current_span
+from log_pipeline import bind_log_context, log_event
 
-# Configure logging for console output
-logging.basicConfig(
-    level=logging.INFO,
-    format='\033[36m%(asctime)s\033[0m | \033[33m%(levelname)s\033[0m | %(message)s',
-    datefmt='%H:%M:%S'
-)
+# Output is configured by log_pipeline.setup_logging() (queued, off the event loop)
 logger = logging.getLogger("otto.tools")
 
 def log_tool_call(tool_name: str, **kwargs):
-    """Log tool calls with formatted output"""
-    args_str = ", ".join(f"{k}={v!r}" for k, v in kwargs.items() if v is not None)
-    print(f"\n\033[1;35m🔧 TOOL CALL:\033[0m \033[1;32m{tool_name}\033[0m({args_str})")
+    """Log a tool call with its (redacted on output) arguments"""
+    args = {k: v for k, v in kwargs.items() if v is not None}
+    log_event(logger, "tool_call", f"🔧 TOOL CALL: {tool_name}", tool=tool_name, **args)
 
 def log_tool_result(tool_name: str, result: str):
-    """Log tool results with formatted output"""
+    """Log a tool result preview with the call's timing"""
     # Truncate long results for readability
     display_result = result[:200] + "..." if len(result) > 200 else result
-    print(f"\033[1;35m📤 RESULT:\033[0m {display_result}\n")
+    span = current_span()
+    log_event(
+        logger, "tool_result", f"📤 RESULT: {tool_name}",
+        tool=tool_name,
+        preview=display_result,
+        chars=len(result),
+        duration_ms=round(span.duration_ms) if span else None,
+        cache=span.cache if span else None,
+    )
 
 # API base URL - connects to the Next.js app
 API_URL = os.getenv("API_URL", "http://localhost:3000")
 
-# Current user ID (set by main.py when participant connects)
-_current_user_id: Optional[str] = None
+# Web search runs on a small dedicated pool so it never blocks the audio loop
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "4"))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "5.0"))
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="otto-search")
+
+# Only the fields each tool reads (the routes project list items with ?fields=).
+# Set API_COMPACT_PAYLOADS=0 to fetch the full UI-shaped responses instead.
+COMPACT_PAYLOADS = os.getenv("API_COMPACT_PAYLOADS", "1") != "0"
+AGENT_FIELDS = {
+    "/api/github": "id,event_type,actor,title,date,state,repo",
+    "/api/gmail": "id,actor,email,title,date,unread",
+    "/api/calendar": "id,title,time,date,isToday,location",
+}
+
+# GitHub activity is answered from the local store; a scope is re-synced after
+# this many seconds (webhook deliveries keep it current in between)
+ACTIVITY_SYNC_INTERVAL = float(os.getenv("ACTIVITY_SYNC_INTERVAL", "300"))
+# Incremental syncs re-read this far before the last sync to catch late pushes
+ACTIVITY_SYNC_OVERLAP = 600
+
+# Recency half-life (seconds) for ranking GitHub activity
+GITHUB_HALF_LIFE = 6 * 3600
+
+# Calendar window limits: longest look-ahead and most events requested per call
+CALENDAR_MAX_DAYS = 31
+CALENDAR_MAX_EVENTS = int(os.getenv("CALENDAR_MAX_EVENTS", "10"))
+
+# Per-source deadlines for get_daily_briefing (seconds)
+BRIEFING_DEADLINES = {
+    "Calendar": float(os.getenv("BRIEFING_CALENDAR_DEADLINE", "3.0")),
+    "Email": float(os.getenv("BRIEFING_EMAIL_DEADLINE", "3.0")),
+    "GitHub": float(os.getenv("BRIEFING_GITHUB_DEADLINE", "4.0")),
+}
+# Briefing fetches still running (past their deadline, or after a barge-in), kept referenced until they finish
+_background_tasks: set[asyncio.Task] = set()
+
+# Current user ID, scoped to the job's task (set by main.py when participant connects).
+# Tasks spawned by the session inherit it, so concurrent rooms in one process stay isolated.
+_current_user_id: ContextVar[Optional[str]] = ContextVar("otto_user_id", default=None)
+
+
+@dataclass
+class SessionData:
+    """Per-session state carried on AgentSession.userdata"""
+    user_id: Optional[str] = None
+    turn_budget: Optional[TurnBudget] = None
+    # Set when start_turn() is called on every user turn; otherwise each tool
+    # call gets its own budget
+    turn_events: bool = False
+    # Items behind this conversation's latest answers, for follow-up lookups
+    working_set: WorkingSet = field(default_factory=WorkingSet)
 
 
 def set_current_user_id(user_id: str):
-    """Set the current user ID for API calls"""
-    global _current_user_id
-    _current_user_id = user_id
-    print(f"\033[1;33m🔐 User context set: {user_id}\033[0m")
+    """Set the current user ID for API calls made from this task"""
+    _current_user_id.set(user_id)
+    bind_log_context(user_id=user_id)
+    logger.info("🔐 User context set")
+
+
+def get_current_user_id(context: Optional[RunContext] = None) -> Optional[str]:
+    """Resolve the user for a tool call: session userdata first, then the task context"""
+    if context is not None:
+        try:
+            userdata = context.userdata
+        except (AttributeError, ValueError):
+            userdata = None
+        if isinstance(userdata, SessionData) and userdata.user_id:
+            return userdata.user_id
+    return _current_user_id.get()
 
 
-def get_api_headers() -> dict:
+def get_working_set(context: Optional[RunContext]) -> Optional[WorkingSet]:
+    """The session's working set, if the tool runs inside a session"""
+    try:
+        userdata = context.userdata
+    except (AttributeError, ValueError):
+        return None
+    return userdata.working_set if isinstance(userdata, SessionData) else None
+
+
+async def api_request(method: str, path: str, user_id: Optional[str], **kwargs) -> httpx.Response:
+    """
+    Call the Next.js API on the shared client, recording latency/status/bytes on
+    the tool span. Each endpoint has a circuit breaker (fails fast with
+    CircuitOpenError while open); idempotent GETs are retried with jittered
+    backoff while the turn budget allows.
+    """
+    breaker = breaker_for(path)
+    attempts = 1 + (HTTP_RETRIES if method == "GET" else 0)
+    for attempt in range(1, attempts + 1):
+        breaker.before_call()
+        started = time.perf_counter()
+        try:
+            response = await get_http_client().request(
+                method,
+                f"{API_URL}{path}",
+                headers=get_api_headers(user_id),
+                timeout=budget_timeout(10.0),
+                **kwargs
+            )
+        except httpx.TransportError as e:
+            record_http(None, 0, (time.perf_counter() - started) * 1000)
+            breaker.record_failure()
+            if attempt == attempts or not await _retry_pause(breaker, attempt, f"{method} {path} failed ({e.__class__.__name__})"):
+                raise
+            continue
+        except BaseException:
+            breaker.record_cancelled()
+            raise
+
+        record_http(response.status_code, len(response.content), (time.perf_counter() - started) * 1000)
+        if not is_retryable(response.status_code):
+            breaker.record_success()
+            return response
+        breaker.record_failure()
+        if attempt == attempts or not await _retry_pause(breaker, attempt, f"{method} {path} returned {response.status_code}"):
+            return response
+
+
+async def _retry_pause(breaker: CircuitBreaker, attempt: int, reason: str) -> bool:
+    """
+    Back off before the next attempt; False if that would overrun the turn
+    budget. Raises CircuitOpenError at once if the last failure opened the breaker.
+    """
+    try:
+        breaker.raise_if_open()
+    except CircuitOpenError:
+        logger.warning(f"{reason}, circuit now open - not retrying (breakers: {breaker_states()})")
+        raise
+    delay = retry_delay(attempt)
+    budget = current_budget()
+    if budget is not None and budget.remaining() < delay + MIN_CALL_SECONDS:
+        return False
+    logger.warning(f"{reason}, retrying in {delay * 1000:.0f} ms")
+    await asyncio.sleep(delay)
+    return True
+
+
+def agent_params(path: str, params: dict) -> dict:
+    """Add the compact field projection for `path` to a GET's query params"""
+    if COMPACT_PAYLOADS and path in AGENT_FIELDS:
+        return {**params, "fields": AGENT_FIELDS[path]}
+    return params
+
+
+def get_api_headers(user_id: Optional[str] = None) -> dict:
     """Get headers for API calls, including user authentication"""
     headers = {"Content-Type": "application/json"}
-    if _current_user_id:
-        headers["X-User-ID"] = _current_user_id
+    user_id = user_id or _current_user_id.get()
+    if user_id:
+        headers["X-User-ID"] = user_id
     return headers
 
 
+async def sync_github_activity(
+    user_id: Optional[str],
+    repo_name: Optional[str] = None,
+    days_back: int = 1
+) -> bool:
+    """
+    Bring the activity store up to date for this user and repo scope: a full
+    fetch of the window the first time, then only activity since the last sync.
+    Returns False if the API call failed.
+    """
+    store = await run_in_store_thread(get_activity_store)
+    user_key = user_id or ""
+    scope = (repo_name or "").strip().lower()
+    now = time.time()
+    wanted_from = now - days_back * 86400
+
+    state = await run_in_store_thread(store.sync_state, user_key, scope)
+    params = {"action": "events", "days": days_back}
+    if repo_name:
+        params["repo"] = repo_name
+    if state is not None and state[1] <= wanted_from:
+        synced_at, _ = state
+        if now - synced_at < ACTIVITY_SYNC_INTERVAL:
+            return True
+        since = datetime.fromtimestamp(synced_at - ACTIVITY_SYNC_OVERLAP, timezone.utc)
+        params["since"] = since.isoformat(timespec="seconds")
+
+    response = await api_request(
+        "GET",
+        "/api/github",
+        user_id,
+        params=agent_params("/api/github", params),
+    )
+    if response.status_code != 200:
+        logger.error(f"GitHub API error: {response.status_code}")
+        return False
+
+    stored = await run_in_store_thread(store.upsert_events, response.json().get("events", []), user_key)
+    await run_in_store_thread(store.record_sync, user_key, scope, now, wanted_from)
+    logger.info(f"Synced {stored} GitHub events ({'incremental' if 'since' in params else 'full'})")
+    return True
+
+
+async def fetch_github_activity(
+    user_id: Optional[str],
+    repo_name: Optional[str] = None,
+    days_back: int = 1
+) -> tuple[str, bool, Optional[list[WorkingItem]]]:
+    """Format GitHub activity from the local store, syncing it first if stale. Returns (result, cacheable, items)."""
+    days_back = max(days_back, 1)
+    try:
+        try:
+            synced = await sync_github_activity(user_id, repo_name, days_back)
+        except Exception as e:
+            # Whatever the store already holds is still worth answering from
+            logger.warning(f"GitHub sync failed: {e}")
+            synced = False
+        store = await run_in_store_thread(get_activity_store)
+        scope = (repo_name or "").strip().lower()
+        if not synced and await run_in_store_thread(store.sync_state, user_id or "", scope) is None:
+            return "I couldn't fetch GitHub activity right now.", False, None
+
+        # Indexed query - cost doesn't grow with the number of repos
+        events = await run_in_store_thread(
+            store.recent_events, user_id or "", time.time() - days_back * 86400, repo_name
+        )
+        
+        if not events:
+            return "No GitHub activity found for the specified period.", synced, []
+        
+        # Rank by recency (open PRs first among equals) and fit the token budget
+        now = time.time()
+        commits = [e for e in events if e.get("event_type") == "commit"]
+        prs = [e for e in events if e.get("event_type") == "pull_request"]
+        open_prs = sum(1 for pr in prs if pr.get("state") == "open")
+        
+        def working_item(e: dict) -> WorkingItem:
+            return WorkingItem(
+                title=e.get("title") or "",
+                id=e.get("id"),
+                person=e.get("actor"),
+                repo=e.get("repo"),
+                when=datetime.fromtimestamp(e["occurred_at"]).strftime("%a %b %d %H:%M"),
+                details={"type": "pull request" if e.get("event_type") == "pull_request" else "commit", "state": e.get("state")},
+            )
+
+        commit_items = [
+            ResultItem(
+                f"  - {c.get('actor') or 'Someone'}: {c.get('title') or 'made changes'}",
+                recency_score(now - c["occurred_at"], GITHUB_HALF_LIFE),
+                ref=working_item(c),
+            )
+            for c in commits
+        ]
+        pr_items = [
+            ResultItem(
+                f"  - {pr.get('actor') or 'Someone'}: {pr.get('title') or 'opened a PR'}",
+                recency_score(now - pr["occurred_at"], GITHUB_HALF_LIFE) + (0.5 if pr.get("state") == "open" else 0.0),
+                ref=working_item(pr),
+            )
+            for pr in prs
+        ]
+        result, kept = shape_result("get_github_activity", [
+            Section(f"{len(commits)} commits", commit_items),
+            Section(f"{len(prs)} pull requests ({open_prs} open)", pr_items),
+        ])
+        # Compress if large
+        final_result = await compress_text(result) if estimate_tokens(result) > COMPRESS_MIN_TOKENS else result
+        # Positions follow what was read out, not the full list
+        return final_result, synced, [item.ref for item in kept]
+            
+    except Exception as e:
+        logger.error(f"Error fetching GitHub activity: {e}")
+        return "There was an error connecting to GitHub.", False, None
+
+
+async def fetch_unread_emails(user_id: Optional[str], max_count: int = 5) -> tuple[str, bool, Optional[list[WorkingItem]]]:
+    """Fetch and format recent emails. Returns (result, cacheable, items)."""
+    try:
+        response = await api_request(
+            "GET",
+            "/api/gmail",
+            user_id,
+            params=agent_params("/api/gmail", {"limit": max_count}),
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            emails = data.get("events", [])
+            
+            if not emails:
+                return "No unread emails found. Your inbox is clear!", True, []
+            
+            # Newest first, unread ahead of read, within the token budget
+            items = []
+            for i, email in enumerate(emails[:max_count]):
+                sender = email.get("actor", "Unknown sender")
+                subject = email.get("title", "No subject")
+                # Clean up sender name
+                if "<" in sender:
+                    sender = sender.split("<")[0].strip()
+                score = 1.0 / (1 + i) + (1.0 if email.get("unread") else 0.0)
+                items.append(ResultItem(f"  - From {sender}: {subject}", score, ref=WorkingItem(
+                    title=subject,
+                    id=email.get("id"),
+                    person=sender,
+                    when=email.get("date"),
+                    details={"email": email.get("email"), "unread": "yes" if email.get("unread") else None},
+                )))
+            
+            heading = f"You have {len(items)} recent emails:"
+            result, kept = shape_result("get_unread_emails", [Section(heading, items)])
+            return result, True, [item.ref for item in kept]
+        elif response.status_code == 401:
+            return "Gmail is not connected. Please connect it in your dashboard.", False, None
+        else:
+            logger.error(f"Gmail API error: {response.status_code}")
+            return "I couldn't fetch emails right now.", False, None
+            
+    except Exception as e:
+        logger.error(f"Error fetching emails: {e}")
+        return "There was an error connecting to Gmail.", False, None
+
+
+def calendar_window(days_ahead: int, now: Optional[datetime] = None) -> tuple[datetime, datetime]:
+    """From now through the end of the last requested day, in local time (days_ahead=1 is today)"""
+    now = now or datetime.now().astimezone()
+    last_day = now + timedelta(days=days_ahead - 1)
+    return now, last_day.replace(hour=23, minute=59, second=59, microsecond=0)
+
+
+def describe_window(days_ahead: int) -> str:
+    if days_ahead == 1:
+        return "today"
+    if days_ahead == 2:
+        return "today and tomorrow"
+    return f"in the next {days_ahead} days"
+
+
+async def fetch_calendar_events(user_id: Optional[str], days_ahead: int = 1) -> tuple[str, bool, Optional[list[WorkingItem]]]:
+    """Fetch and format events in the requested window. Returns (result, cacheable, items)."""
+    days_ahead = min(max(days_ahead, 1), CALENDAR_MAX_DAYS)
+    start, end = calendar_window(days_ahead)
+    when = describe_window(days_ahead)
+    try:
+        response = await api_request(
+            "GET",
+            "/api/calendar",
+            user_id,
+            params=agent_params("/api/calendar", {
+                "start": start.isoformat(timespec="seconds"),
+                "end": end.isoformat(timespec="seconds"),
+                "limit": CALENDAR_MAX_EVENTS,
+            }),
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            events = data.get("events", [])
+            
+            if not events:
+                return f"No meetings scheduled {when}. Your calendar is clear!", True, []
+            
+            # Soonest first, within the token budget
+            count = f"at least {len(events)}" if data.get("truncated") else str(len(events))
+            items = []
+            for i, event in enumerate(events):
+                title = event.get("title", "Untitled meeting")
+                time = event.get("time", "")
+                ref = WorkingItem(
+                    title=title,
+                    id=event.get("id"),
+                    when=f"{event.get('date', '')} {time}".strip(),
+                    details={"location": event.get("location")},
+                )
+                if days_ahead > 1 and not event.get("isToday"):
+                    items.append(ResultItem(f"  - {title} on {event.get('date', '')} at {time}", -i, ref=ref))
+                else:
+                    items.append(ResultItem(f"  - {title} at {time}", -i, ref=ref))
+            
+            heading = f"You have {count} meetings {when}:"
+            result, kept = shape_result("get_calendar_events", [Section(heading, items)])
+            return result, True, [item.ref for item in kept]
+        elif response.status_code == 401:
+            return "Google Calendar is not connected. Please connect it in your dashboard.", False, None
+        else:
+            logger.error(f"Calendar API error: {response.status_code}")
+            return "I couldn't fetch your calendar right now.", False, None
+            
+    except Exception as e:
+        logger.error(f"Error fetching calendar: {e}")
+        return "There was an error connecting to Google Calendar.", False, None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical upstream calls: the first caller starts the
+    fetch, everyone asking for the same key while it runs awaits that result.
+    """
+
+    def __init__(self):
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    async def do(self, key: tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        # Tasks belong to one event loop, so thread-executor jobs coalesce per loop
+        key = (id(asyncio.get_running_loop()),) + key
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            record_coalesced()
+            logger.info(f"Coalesced with in-flight request: {key[1]}")
+        # Shielded so one caller barging in doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+
+_single_flight = SingleFlight()
+
+
+async def cached_github_activity(
+    user_id: Optional[str],
+    repo_name: Optional[str] = None,
+    days_back: int = 1
+) -> str:
+    """GitHub activity through the response cache"""
+    return await response_cache.get_or_fetch(
+        user_id,
+        "get_github_activity",
+        {"repo_name": repo_name, "days_back": days_back},
+        lambda: _single_flight.do(
+            ("/api/github", user_id, (repo_name or "").strip().lower(), days_back),
+            lambda: fetch_github_activity(user_id, repo_name, days_back),
+        ),
+    )
+
+
+async def cached_unread_emails(user_id: Optional[str], max_count: int = 5) -> str:
+    """Recent emails through the response cache"""
+    return await response_cache.get_or_fetch(
+        user_id,
+        "get_unread_emails",
+        {"max_count": max_count},
+        lambda: _single_flight.do(
+            ("/api/gmail", user_id, max_count),
+            lambda: fetch_unread_emails(user_id, max_count),
+        ),
+    )
+
+
+async def cached_calendar_events(user_id: Optional[str], days_ahead: int = 1) -> str:
+    """Upcoming events through the response cache"""
+    return await response_cache.get_or_fetch(
+        user_id,
+        "get_calendar_events",
+        {"days_ahead": days_ahead},
+        lambda: _single_flight.do(
+            ("/api/calendar", user_id, days_ahead),
+            lambda: fetch_calendar_events(user_id, days_ahead),
+        ),
+    )
+
+
+async def prefetch_briefing(user_id: str) -> None:
+    """
+    Warm the cache with the data behind "what's on my plate" using the
+    tools' default arguments, so the first question is answered from cache.
+    """
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        cached_github_activity(user_id),
+        cached_unread_emails(user_id),
+        cached_calendar_events(user_id),
+        return_exceptions=True,
+    )
+    failed = sum(1 for r in results if isinstance(r, Exception))
+    logger.info(f"Prefetched briefing data in {time.perf_counter() - started:.2f}s ({failed} failed)")
+
+
 @function_tool()
+@instrument_tool
+@with_turn_budget
+async def get_daily_briefing(context: RunContext) -> str:
+    """
+    Get a combined briefing of today's meetings, recent emails and GitHub activity.
+    Use this for broad questions like "what's on my plate today?" instead of
+    calling the calendar, email and GitHub tools one by one.
+    """
+    log_tool_call("get_daily_briefing")
+    user_id = get_current_user_id(context)
+    # (label, tool, arguments, fetch) - each source with its tool's default arguments
+    sources = [
+        ("Calendar", "get_calendar_events", {"days_ahead": 1}, cached_calendar_events),
+        ("Email", "get_unread_emails", {"max_count": 5}, cached_unread_emails),
+        ("GitHub", "get_github_activity", {"repo_name": None, "days_back": 1}, cached_github_activity),
+    ]
+
+    async def fetch_source(fetch, args: dict) -> tuple[str, bool, Optional[list[WorkingItem]]]:
+        section = await fetch(user_id, **args)
+        return section, last_answered(), last_items()
+
+    tasks = [(label, asyncio.create_task(fetch_source(fetch, args))) for label, _, args, fetch in sources]
+    # Held until done, so a slow source or a barge-in doesn't leave them unreferenced
+    for _, task in tasks:
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def with_deadline(label: str, task: asyncio.Task) -> Optional[tuple[str, bool, Optional[list[WorkingItem]]]]:
+        try:
+            # Shielded so a slow source keeps running and lands in the cache for the follow-up
+            deadline = budget_timeout(BRIEFING_DEADLINES[label])
+            return await asyncio.wait_for(asyncio.shield(task), timeout=deadline)
+        except asyncio.TimeoutError:
+            return None
+        except Exception as e:
+            logger.warning(f"Briefing source {label} failed: {e}")
+            return f"I couldn't load your {label.lower()} right now.", False, None
+
+    results = await asyncio.gather(*(with_deadline(label, task) for label, task in tasks))
+
+    sections = []
+    pending = []
+    failed = []
+    working_set = get_working_set(context)
+    for (label, tool, _, _), outcome in zip(sources, results):
+        if outcome is None:
+            pending.append(label)
+            continue
+        section, answered, items = outcome
+        sections.append(f"{label}: {section}")
+        activate_items(working_set, tool, items)
+        if not answered:
+            failed.append(label)
+
+    if failed and len(failed) + len(pending) == len(sources):
+        result = f"I couldn't get your briefing right now: {' and '.join(failed)} failed"
+        if pending:
+            result += f", {' and '.join(pending)} {'are' if len(pending) > 1 else 'is'} still loading"
+        result += ". Please try again in a moment."
+    elif not sections:
+        result = "Your data is still loading. Ask me again in a moment."
+    else:
+        result = "Here's your briefing.\n" + "\n".join(sections)
+        if pending:
+            result += f"\nStill waiting on {' and '.join(pending)}. Ask again in a moment for those."
+    log_tool_result("get_daily_briefing", result)
+    return result
+
+
+@function_tool()
+@instrument_tool
+@with_turn_budget
 async def get_github_activity(
     context: RunContext,
     repo_name: Optional[str] = None,
@@ -67,64 +613,16 @@ async def get_github_activity(
         days_back: Number of days to look back (default: 1 for yesterday)
     """
     log_tool_call("get_github_activity", repo_name=repo_name, days_back=days_back)
-    try:
-        async with httpx.AsyncClient() as client:
-            params = {"action": "events"}  # Use events endpoint
-            if repo_name:
-                params["repo"] = repo_name
-            if days_back:
-                params["days"] = days_back
-                
-            response = await client.get(
-                f"{API_URL}/api/github",
-                params=params,
-                headers=get_api_headers(),
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                events = data.get("events", [])
-                
-                if not events:
-                    return "No GitHub activity found for the specified period."
-                
-                # Format for voice
-                summaries = []
-                commits = [e for e in events if e.get("event_type") == "commit"]
-                prs = [e for e in events if e.get("event_type") == "pull_request"]
-                
-                if commits:
-                    summaries.append(f"{len(commits)} commits")
-                    for c in commits[:5]:
-                        actor = c.get("actor", "Someone")
-                        title = c.get("title", "made changes")
-                        summaries.append(f"  - {actor}: {title}")
-                        
-                if prs:
-                    summaries.append(f"{len(prs)} open pull requests")
-                    for pr in prs[:3]:
-                        actor = pr.get("actor", "Someone")
-                        title = pr.get("title", "opened a PR")
-                        summaries.append(f"  - {actor}: {title}")
-                
-                result = "\n".join(summaries)
-                # Compress if large
-                final_result = await compress_text(result) if len(result) > 500 else result
-                log_tool_result("get_github_activity", final_result)
-                return final_result
-            else:
-                logging.error(f"GitHub API error: {response.status_code}")
-                result = "I couldn't fetch GitHub activity right now."
-                log_tool_result("get_github_activity", result)
-                return result
-                
-    except Exception as e:
-        logging.error(f"Error fetching GitHub activity: {e}")
-        return "There was an error connecting to GitHub."
+    user_id = get_current_user_id(context)
+    result = await cached_github_activity(user_id, repo_name, days_back)
+    activate_items(get_working_set(context), "get_github_activity", last_items())
+    log_tool_result("get_github_activity", result)
+    return result
 
 
 @function_tool()
+@instrument_tool
+@with_turn_budget
 async def get_unread_emails(
     context: RunContext,
     max_count: int = 5
@@ -136,45 +634,16 @@ async def get_unread_emails(
         max_count: Maximum number of emails to return (default: 5)
     """
     log_tool_call("get_unread_emails", max_count=max_count)
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_URL}/api/gmail",
-                params={"limit": max_count},
-                headers=get_api_headers(),
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                emails = data.get("events", [])
-                
-                if not emails:
-                    return "No unread emails found. Your inbox is clear!"
-                
-                # Format for voice
-                summaries = [f"You have {len(emails)} recent emails:"]
-                for i, email in enumerate(emails[:max_count], 1):
-                    sender = email.get("actor", "Unknown sender")
-                    subject = email.get("title", "No subject")
-                    # Clean up sender name
-                    if "<" in sender:
-                        sender = sender.split("<")[0].strip()
-                    summaries.append(f"  {i}. From {sender}: {subject}")
-                
-                return "\n".join(summaries)
-            elif response.status_code == 401:
-                return "Gmail is not connected. Please connect it in your dashboard."
-            else:
-                logging.error(f"Gmail API error: {response.status_code}")
-                return "I couldn't fetch emails right now."
-                
-    except Exception as e:
-        logging.error(f"Error fetching emails: {e}")
-        return "There was an error connecting to Gmail."
+    user_id = get_current_user_id(context)
+    result = await cached_unread_emails(user_id, max_count)
+    activate_items(get_working_set(context), "get_unread_emails", last_items())
+    log_tool_result("get_unread_emails", result)
+    return result
 
 
 @function_tool()
+@instrument_tool
+@with_turn_budget
 async def get_calendar_events(
     context: RunContext,
     days_ahead: int = 1
@@ -183,45 +652,19 @@ async def get_calendar_events(
     Get upcoming calendar events/meetings.
     
     Args:
-        days_ahead: Number of days ahead to look (default: 1 for today)
+        days_ahead: Days to look at, counting today (1 = rest of today, 2 = through tomorrow, max 31)
     """
     log_tool_call("get_calendar_events", days_ahead=days_ahead)
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_URL}/api/calendar",
-                params={"days": days_ahead},
-                headers=get_api_headers(),
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                events = data.get("events", [])
-                
-                if not events:
-                    return "No meetings scheduled for today. Your calendar is clear!"
-                
-                # Format for voice
-                summaries = [f"You have {len(events)} meetings today:"]
-                for event in events:
-                    title = event.get("title", "Untitled meeting")
-                    time = event.get("time", "")
-                    summaries.append(f"  - {title} at {time}")
-                
-                return "\n".join(summaries)
-            elif response.status_code == 401:
-                return "Google Calendar is not connected. Please connect it in your dashboard."
-            else:
-                logging.error(f"Calendar API error: {response.status_code}")
-                return "I couldn't fetch your calendar right now."
-                
-    except Exception as e:
-        logging.error(f"Error fetching calendar: {e}")
-        return "There was an error connecting to Google Calendar."
+    user_id = get_current_user_id(context)
+    result = await cached_calendar_events(user_id, days_ahead)
+    activate_items(get_working_set(context), "get_calendar_events", last_items())
+    log_tool_result("get_calendar_events", result)
+    return result
 
 
 @function_tool()
+@instrument_tool
+@with_turn_budget
 async def create_calendar_event(
     context: RunContext,
     title: str,
@@ -235,124 +678,53 @@ async def create_calendar_event(
     
     Args:
         title: Title of the meeting
-        date: Date in format "YYYY-MM-DD" or natural language like "tomorrow"
+        date: Date in format "YYYY-MM-DD" or natural language like "tomorrow", "next Friday" or "in 3 days"
         time: Time in format "HH:MM" (24-hour) or "3pm"
         duration_minutes: Duration in minutes (default: 60)
         attendees: Comma-separated list of attendee emails (optional)
     """
     log_tool_call("create_calendar_event", title=title, date=date, time=time, duration_minutes=duration_minutes, attendees=attendees)
+    user_id = get_current_user_id(context)
     try:
-        # Parse natural language dates
-        event_date = date
-        date_lower = date.lower().strip()
+        # Parse natural language dates/times (unrecognised input is passed through)
+        event_date = parse_date(date) or date
+        event_time = parse_time(time) or time
         
-        if date_lower == "today":
-            event_date = datetime.now().strftime("%Y-%m-%d")
-        elif date_lower == "tomorrow":
-            event_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        elif date_lower in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]:
-            days_of_week = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-            target_weekday = days_of_week.index(date_lower)
-            current_weekday = datetime.now().weekday()
-            days_ahead = target_weekday - current_weekday
-            if days_ahead <= 0: # Target day is today or has passed this week
-                days_ahead += 7
-            event_date = (datetime.now() + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-        elif date_lower == "next week":
-            event_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
-        else:
-            # Try to parse various date formats
-            date_formats = [
-                "%Y-%m-%d",           # 2026-01-20
-                "%m/%d/%Y",           # 01/20/2026
-                "%m-%d-%Y",           # 01-20-2026
-                "%B %d",              # January 20
-                "%B %dth",            # January 20th
-                "%B %dst",            # January 1st
-                "%B %dnd",            # January 2nd
-                "%B %drd",            # January 3rd
-                "%b %d",              # Jan 20
-                "%b %dth",            # Jan 20th
-                "%b %dst",            # Jan 1st
-                "%b %dnd",            # Jan 2nd
-                "%b %drd",            # Jan 3rd
-                "%b. %d",             # Jan. 20
-                "%b. %dth",           # Jan. 20th
-            ]
-            
-            # Clean up the date string - remove ordinal suffixes
-            clean_date = date_lower.replace("st", "").replace("nd", "").replace("rd", "").replace("th", "").strip()
-            
-            parsed_date = None
-            for fmt in date_formats:
-                # Also try with cleaned date
-                for try_date in [date, clean_date]:
-                    try:
-                        parsed_date = datetime.strptime(try_date, fmt)
-                        # If year not in format, use current year
-                        if parsed_date.year == 1900:
-                            parsed_date = parsed_date.replace(year=datetime.now().year)
-                            # If the date has passed, use next year
-                            if parsed_date < datetime.now():
-                                parsed_date = parsed_date.replace(year=datetime.now().year + 1)
-                        event_date = parsed_date.strftime("%Y-%m-%d")
-                        break
-                    except ValueError:
-                        continue
-                if parsed_date:
-                    break
+        payload = {
+            "title": title,
+            "date": event_date,
+            "time": event_time,
+            "duration": duration_minutes,
+        }
+        if attendees:
+            payload["attendees"] = [a.strip() for a in attendees.split(",")]
         
-        # Parse time formats
-        event_time = time
-        time_lower = time.lower().strip().replace(" ", "")
-        if "pm" in time_lower or "am" in time_lower:
-            # Convert 3pm -> 15:00, 11pm -> 23:00, 3:30pm -> 15:30
-            time_formats = [
-                "%I%p",      # 3pm
-                "%I:%M%p",   # 3:30pm
-                "%I:00%p",   # 3:00pm
-            ]
-            for fmt in time_formats:
-                try:
-                    parsed = datetime.strptime(time_lower, fmt)
-                    event_time = parsed.strftime("%H:%M")
-                    break
-                except ValueError:
-                    continue
+        response = await api_request(
+            "POST",
+            "/api/calendar",
+            user_id,
+            json=payload,
+        )
         
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "title": title,
-                "date": event_date,
-                "time": event_time,
-                "duration": duration_minutes,
-            }
-            if attendees:
-                payload["attendees"] = [a.strip() for a in attendees.split(",")]
-            
-            response = await client.post(
-                f"{API_URL}/api/calendar",
-                json=payload,
-                headers=get_api_headers(),
-                timeout=10.0
-            )
+        if response.status_code in [200, 201]:
+            response_cache.invalidate(user_id, ["get_calendar_events"])
+            result = f"Done! I've scheduled '{title}' for {event_date} at {event_time}."
+            log_tool_result("create_calendar_event", result)
+            return result
+        elif response.status_code == 401:
+            return "Google Calendar is not connected. Please connect it in your dashboard."
+        else:
+            logger.error(f"Calendar create error: {response.status_code}")
+            return "I couldn't create the event right now."
             
-            if response.status_code in [200, 201]:
-                result = f"Done! I've scheduled '{title}' for {event_date} at {event_time}."
-                log_tool_result("create_calendar_event", result)
-                return result
-            elif response.status_code == 401:
-                return "Google Calendar is not connected. Please connect it in your dashboard."
-            else:
-                logging.error(f"Calendar create error: {response.status_code}")
-                return "I couldn't create the event right now."
-                
     except Exception as e:
-        logging.error(f"Error creating calendar event: {e}")
+        logger.error(f"Error creating calendar event: {e}")
         return "There was an error creating the calendar event."
 
 
 @function_tool()
+@instrument_tool
+@with_turn_budget
 async def send_email(
     context: RunContext,
     to: str,
@@ -367,37 +739,89 @@ async def send_email(
         subject: Email subject line
         body: Email body content
     """
-    log_tool_call("send_email", to=to, subject=subject, body=body[:50]+"..." if len(body) > 50 else body)
+    log_tool_call("send_email", to=to, subject=subject, body=body)
+    user_id = get_current_user_id(context)
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{API_URL}/api/gmail/send",
-                json={
-                    "to": to,
-                    "subject": subject,
-                    "body": body
-                },
-                headers=get_api_headers(),
-                timeout=10.0
-            )
+        response = await api_request(
+            "POST",
+            "/api/gmail/send",
+            user_id,
+            json={
+                "to": to,
+                "subject": subject,
+                "body": body
+            },
+        )
+        
+        if response.status_code in [200, 201]:
+            response_cache.invalidate(user_id, ["get_unread_emails"])
+            result = f"Done! Email sent to {to}."
+            log_tool_result("send_email", result)
+            return result
+        elif response.status_code == 401:
+            return "Gmail is not connected. Please connect it in your dashboard."
+        else:
+            logger.error(f"Gmail send error: {response.status_code}")
+            return "I couldn't send the email right now."
             
-            if response.status_code in [200, 201]:
-                result = f"Done! Email sent to {to}."
-                log_tool_result("send_email", result)
-                return result
-            elif response.status_code == 401:
-                return "Gmail is not connected. Please connect it in your dashboard."
-            else:
-                logging.error(f"Gmail send error: {response.status_code}")
-                return "I couldn't send the email right now."
-                
     except Exception as e:
-        logging.error(f"Error sending email: {e}")
+        logger.error(f"Error sending email: {e}")
         return "There was an error sending the email."
 
 
 
+def _ddg_search(query: str, max_results: int) -> list[dict]:
+    """Blocking DuckDuckGo search - runs on the search thread pool"""
+    cassette = get_cassette()
+    if cassette is not None:
+        return cassette.call("ddgs", f"{query}|{max_results}", lambda: _ddg_text(query, max_results))
+    return _ddg_text(query, max_results)
+
+
+def _ddg_text(query: str, max_results: int) -> list[dict]:
+    # Imported on first search so worker startup doesn't pay for it
+    from duckduckgo_search import DDGS
+    with DDGS(timeout=SEARCH_TIMEOUT) as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
+
+async def fetch_web_search(query: str) -> tuple[str, bool, Optional[list[WorkingItem]]]:
+    """Run a web search off the event loop. Returns (result, cacheable, items)."""
+    loop = asyncio.get_running_loop()
+    timeout = budget_timeout(SEARCH_TIMEOUT)
+    try:
+        results = await asyncio.wait_for(
+            loop.run_in_executor(_search_executor, _ddg_search, query, 3),
+            timeout=timeout,
+        )
+        
+        if not results:
+            return "I couldn't find any results for that query.", False, None
+        
+        # Search rank order; bodies are shortened rather than dropped to fit the budget
+        items = [
+            ResultItem(
+                f"  {i}. {r.get('title', '')}: {r.get('body', '')}", -i, truncatable=True,
+                ref=WorkingItem(title=r.get("title", ""), id=r.get("href"), details={"summary": r.get("body"), "link": r.get("href")}),
+            )
+            for i, r in enumerate(results, 1)
+        ]
+        result, kept = shape_result("search_web", [Section("Here's what I found:", items)])
+        # Compress if large
+        final_result = await compress_text(result) if estimate_tokens(result) > COMPRESS_MIN_TOKENS else result
+        return final_result, True, [item.ref for item in kept]
+        
+    except asyncio.TimeoutError:
+        logger.warning(f"Web search timed out after {timeout:.1f}s: {query!r}")
+        return "The web search is taking too long right now.", False, None
+    except Exception as e:
+        logger.error(f"Error searching web: {e}")
+        return "There was an error searching the web.", False, None
+
+
 @function_tool()
+@instrument_tool
+@with_turn_budget
 async def search_web(
     context: RunContext,
     query: str
@@ -409,25 +833,57 @@ async def search_web(
         query: The search query
     """
     log_tool_call("search_web", query=query)
+    # Results aren't user-specific, so share them across sessions
+    normalized = " ".join(query.split())
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=3))
-            
-            if not results:
-                return "I couldn't find any results for that query."
-            
-            summaries = ["Here's what I found:"]
-            for i, r in enumerate(results, 1):
-                title = r.get("title", "")
-                body = r.get("body", "")[:200]
-                summaries.append(f"  {i}. {title}: {body}")
-            
-            result = "\n".join(summaries)
-            # Compress if large
-            final_result = await compress_text(result) if len(result) > 500 else result
-            log_tool_result("search_web", final_result)
-            return final_result
-            
-    except Exception as e:
-        logging.error(f"Error searching web: {e}")
-        return "There was an error searching the web."
+        result = await response_cache.get_or_fetch(
+            None,
+            "search_web",
+            {"query": normalized},
+            lambda: _single_flight.do(("search", normalized.lower()), lambda: fetch_web_search(normalized)),
+        )
+    except asyncio.CancelledError:
+        # User barged in - drop the search, the worker thread finishes on its own timeout
+        logger.info(f"Web search cancelled: {normalized!r}")
+        raise
+    activate_items(get_working_set(context), "search_web", last_items())
+    log_tool_result("search_web", result)
+    return result
+
+
+@function_tool()
+@instrument_tool
+async def lookup_recent_results(
+    context: RunContext,
+    source: str,
+    position: Optional[int] = None,
+    match: Optional[str] = None
+) -> str:
+    """
+    Look up an item from an email, calendar, GitHub or search answer given
+    earlier in this conversation, without fetching again. Use this for
+    follow-ups like "who sent the second one?", "reply to the third email"
+    or "which repo was that PR in?".
+    
+    Args:
+        source: "email", "calendar", "github" or "search"
+        position: Position in the earlier answer, counting from 1 (-1 for the last one)
+        match: Sender, author, repo, id or title words to match (e.g. "Alex" or "otto")
+    """
+    log_tool_call("lookup_recent_results", source=source, position=position, match=match)
+    source = source.strip().lower()
+    working_set = get_working_set(context)
+    if source not in SOURCES.values():
+        result = f"I can look up earlier {', '.join(SOURCES.values())} results."
+    elif working_set is None or not working_set.has(source):
+        result = f"I don't have any {source} results from this conversation yet."
+    else:
+        matches = working_set.find(source, position, match)
+        if not matches:
+            result = f"None of the {source} results I gave match that."
+        else:
+            result = "\n".join(f"{i}. {item.describe()}" for i, item in matches[:MAX_MATCHES])
+            if len(matches) > MAX_MATCHES:
+                result += f"\n...and {len(matches) - MAX_MATCHES} more"
+    log_tool_result("lookup_recent_results", result)
+    return result
@@ -5,31 +5,101 @@ Optional dependency - works without tokenc installed
 """
 
 import os
+import time
+import asyncio
+import hashlib
+import importlib.util
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Optional
 
-# Try to import tokenc, but make it optional
-try:
-    from tokenc import TokenClient
-    TOKENC_AVAILABLE = True
-except ImportError:
-    TOKENC_AVAILABLE = False
-    TokenClient = None
+from budget import budget_exhausted, budget_timeout
+from metrics import record_compression
+from cassette import get_cassette
+
+logger = logging.getLogger("otto.ttc")
+
+# tokenc is optional and only imported on first use (find_spec doesn't import it)
+TOKENC_AVAILABLE = importlib.util.find_spec("tokenc") is not None
 
 # Initialize Token Company client
 TTC_API_KEY = os.getenv("TTC_API_KEY")
 _client = None
 
+# Compression is a blocking network call - keep it off the event loop
+TTC_TIMEOUT = float(os.getenv("TTC_TIMEOUT", "3.0"))
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="otto-ttc")
+
+# Content-hash keyed LRU of compressed outputs
+TTC_CACHE_SIZE = int(os.getenv("TTC_CACHE_SIZE", "256"))
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# Stands in for the client while a cassette replays - it is never called
+_REPLAY_CLIENT = object()
+
 
 def get_client():
     """Get or create Token Company client."""
     global _client
+    cassette = get_cassette()
+    if cassette is not None and cassette.replaying:
+        return _REPLAY_CLIENT
     if not TOKENC_AVAILABLE:
         return None
     if _client is None and TTC_API_KEY:
+        from tokenc import TokenClient
         _client = TokenClient(api_key=TTC_API_KEY)
     return _client
 
 
+def _cache_key(text: str, aggressiveness: float) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{aggressiveness:.2f}:{digest}"
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _cache_lock:
+        compressed = _cache.get(key)
+        if compressed is not None:
+            _cache.move_to_end(key)
+        return compressed
+
+
+def _cache_put(key: str, compressed: str) -> None:
+    with _cache_lock:
+        _cache[key] = compressed
+        _cache.move_to_end(key)
+        while len(_cache) > TTC_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _compress_blocking(client, text: str, aggressiveness: float) -> str:
+    """Blocking call to the Token Company API - run off the event loop."""
+    started = time.perf_counter()
+
+    def compress() -> str:
+        return client.compress_input(
+            input=text,
+            aggressiveness=aggressiveness
+        ).output
+
+    cassette = get_cassette()
+    if cassette is not None:
+        compressed = cassette.call("ttc", _cache_key(text, aggressiveness), compress)
+    else:
+        compressed = compress()
+    ratio = len(text) / len(compressed) if compressed else 1.0
+    logger.info(
+        f"Compressed {len(text)} -> {len(compressed)} chars ({ratio:.1f}x) "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return compressed
+
+
 async def compress_text(text: str, aggressiveness: float = 0.7) -> str:
     """
     Compress text using Token Company's bear-1 model.
@@ -39,7 +109,7 @@ async def compress_text(text: str, aggressiveness: float = 0.7) -> str:
         aggressiveness: Compression level 0.0-1.0 (higher = more compression)
     
     Returns:
-        Compressed text, or original if compression fails/unavailable
+        Compressed text, or original if compression fails/unavailable/times out
     """
     client = get_client()
     
@@ -51,24 +121,58 @@ async def compress_text(text: str, aggressiveness: float = 0.7) -> str:
     if len(text) < 500:
         return text
     
+    key = _cache_key(text, aggressiveness)
+    cached = _cache_get(key)
+    if cached is not None:
+        record_compression(len(text), len(cached), 0.0)
+        return cached
+    
+    # Out of turn budget - the uncompressed text is the cheap fallback
+    if budget_exhausted():
+        return text
+    
+    timeout = budget_timeout(TTC_TIMEOUT)
     try:
-        result = client.compress_input(
-            input=text,
-            aggressiveness=aggressiveness
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        compressed = await asyncio.wait_for(
+            loop.run_in_executor(_executor, _compress_blocking, client, text, aggressiveness),
+            timeout=timeout,
         )
-        
-        compressed = result.output
-        ratio = len(text) / len(compressed) if compressed else 1.0
-        logging.info(f"Compressed {len(text)} -> {len(compressed)} chars ({ratio:.1f}x)")
-        
+        if not compressed:
+            return text
+        record_compression(len(text), len(compressed), (time.perf_counter() - started) * 1000)
+        _cache_put(key, compressed)
         return compressed
         
+    except asyncio.TimeoutError:
+        logger.warning(f"Token Company compression timed out after {timeout:.1f}s")
+        return text
     except Exception as e:
-        logging.warning(f"Token Company compression failed: {e}")
+        logger.warning(f"Token Company compression failed: {e}")
         return text
 
 
 def compress_text_sync(text: str, aggressiveness: float = 0.7) -> str:
-    """Synchronous version for non-async contexts."""
-    import asyncio
-    return asyncio.run(compress_text(text, aggressiveness))
+    """Synchronous version for non-async contexts (shares the cache and the TTC_TIMEOUT bound)."""
+    client = get_client()
+    if not client or len(text) < 500:
+        return text
+    
+    key = _cache_key(text, aggressiveness)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    
+    try:
+        compressed = _executor.submit(_compress_blocking, client, text, aggressiveness).result(timeout=TTC_TIMEOUT)
+        if not compressed:
+            return text
+        _cache_put(key, compressed)
+        return compressed
+    except FuturesTimeoutError:
+        logger.warning(f"Token Company compression timed out after {TTC_TIMEOUT:.1f}s")
+        return text
+    except Exception as e:
+        logger.warning(f"Token Company compression failed: {e}")
+        return text
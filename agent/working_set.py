@@ -0,0 +1,112 @@
+"""
+Otto Voice Agent - Session Working Set
+The structured items behind each tool's latest answer, kept per session and
+indexed by position, person, repo and id, so follow-ups like "who sent the
+second one?" are answered locally instead of fetching the list again.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Tool whose answer fills each lookup source
+SOURCES = {
+    "get_unread_emails": "email",
+    "get_calendar_events": "calendar",
+    "get_github_activity": "github",
+    "search_web": "search",
+}
+
+# Most items a lookup reads back at once
+MAX_MATCHES = 3
+
+_WORD_RE = re.compile(r"[\w.@+-]+")
+
+
+@dataclass
+class WorkingItem:
+    """One email, event, commit/PR or search hit, as the user heard it"""
+    title: str
+    id: Optional[str] = None
+    person: Optional[str] = None  # sender or author
+    repo: Optional[str] = None
+    when: Optional[str] = None
+    details: dict = field(default_factory=dict)
+
+    def describe(self) -> str:
+        parts = [self.title]
+        if self.person:
+            parts.append(f"from {self.person}")
+        if self.repo:
+            parts.append(f"in {self.repo}")
+        if self.when:
+            parts.append(f"({self.when})")
+        parts.extend(f"{name}: {value}" for name, value in self.details.items() if value)
+        return ", ".join(parts)
+
+
+def _words(text: Optional[str]) -> set[str]:
+    return {word.lower() for word in _WORD_RE.findall(text or "")}
+
+
+class WorkingSet:
+    """The latest items of each source in one conversation"""
+
+    def __init__(self):
+        self._items: dict[str, list[WorkingItem]] = {}
+        self._by_id: dict[str, dict[str, int]] = {}
+        self._by_word: dict[str, dict[str, list[int]]] = {}
+
+    def update(self, source: str, items: list[WorkingItem]) -> None:
+        """Replace a source's items (positions follow the order they were read out)"""
+        by_id: dict[str, int] = {}
+        by_word: dict[str, list[int]] = {}
+        for position, item in enumerate(items):
+            if item.id:
+                by_id[item.id.lower()] = position
+            # People and repos are what follow-ups name; titles are searched last
+            for word in _words(item.person) | _words(item.repo) | _words(item.details.get("email")):
+                by_word.setdefault(word, []).append(position)
+        self._items[source] = items
+        self._by_id[source] = by_id
+        self._by_word[source] = by_word
+
+    def has(self, source: str) -> bool:
+        return source in self._items
+
+    def find(self, source: str, position: Optional[int] = None, match: Optional[str] = None) -> list[tuple[int, WorkingItem]]:
+        """
+        Items by 1-based position (negative counts from the end) and/or by
+        id, person, repo or title text; returns (position, item) pairs.
+        """
+        items = self._items.get(source, [])
+        if position is not None:
+            index = position - 1 if position > 0 else len(items) + position
+            candidates = [index] if 0 <= index < len(items) else []
+        else:
+            candidates = list(range(len(items)))
+
+        if match:
+            needle = match.strip().lower()
+            exact = self._by_id.get(source, {}).get(needle)
+            if exact is not None:
+                matched = [exact]
+            else:
+                by_word = self._by_word.get(source, {})
+                words = _words(needle)
+                matched = sorted(set.intersection(*(set(by_word.get(word, [])) for word in words))) if words else []
+                if not matched:
+                    matched = [i for i, item in enumerate(items) if needle in item.title.lower()]
+            candidates = [i for i in candidates if i in matched]
+
+        return [(i + 1, items[i]) for i in candidates]
+
+
+def activate_items(working_set: Optional[WorkingSet], tool: str, items: Optional[list[WorkingItem]]) -> None:
+    """
+    Make the items behind an answer (cached with it, see cache.last_items) the
+    session's current ones for that source; an answer without items leaves them.
+    """
+    if working_set is None or items is None:
+        return
+    working_set.update(SOURCES[tool], items)
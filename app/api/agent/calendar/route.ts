@@ -1,5 +1,6 @@
 import { createClient as createAdminClient } from '@supabase/supabase-js'
 import { NextRequest, NextResponse } from 'next/server'
+import { parseFields, projectFields } from '@/lib/field-projection'
 
 // Admin client for DB operations (bypasses RLS)
 const supabaseAdmin = createAdminClient(
@@ -11,6 +12,7 @@ export async function GET(request: NextRequest) {
     const searchParams = request.nextUrl.searchParams
     const userId = searchParams.get('user_id')
     const timeframe = searchParams.get('timeframe') || 'week'
+    const fields = parseFields(searchParams)
 
     if (!userId) {
         return NextResponse.json({ error: 'Missing user_id parameter' }, { status: 400 })
@@ -84,7 +86,7 @@ export async function GET(request: NextRequest) {
         }))
 
         return NextResponse.json({
-            events,
+            events: projectFields(events, fields),
             connected: true
         })
     } catch (err) {
@@ -1,5 +1,6 @@
 import { createClient as createAdminClient } from '@supabase/supabase-js'
 import { NextRequest, NextResponse } from 'next/server'
+import { parseFields, projectFields } from '@/lib/field-projection'
 
 // Admin client for DB operations (bypasses RLS)
 const supabaseAdmin = createAdminClient(
@@ -13,6 +14,7 @@ export async function GET(request: NextRequest) {
     const action = searchParams.get('action') || 'repos'
     const owner = searchParams.get('owner')
     const repo = searchParams.get('repo')
+    const fields = parseFields(searchParams)
 
     if (!userId) {
         return NextResponse.json({ error: 'Missing user_id parameter' }, { status: 400 })
@@ -50,14 +52,14 @@ export async function GET(request: NextRequest) {
             const repos = await response.json()
             return NextResponse.json({
                 connected: true,
-                repos: repos.map((r: any) => ({
+                repos: projectFields(repos.map((r: any) => ({
                     id: r.id,
                     name: r.name,
                     fullName: r.full_name,
                     description: r.description,
                     private: r.private,
                     updatedAt: r.updated_at,
-                }))
+                })), fields)
             })
         }
 
@@ -1,5 +1,6 @@
 import { createClient as createAdminClient } from '@supabase/supabase-js'
 import { NextRequest, NextResponse } from 'next/server'
+import { parseFields, projectFields } from '@/lib/field-projection'
 
 // Admin client for DB operations (bypasses RLS)
 const supabaseAdmin = createAdminClient(
@@ -12,6 +13,7 @@ export async function GET(request: NextRequest) {
     const userId = searchParams.get('user_id')
     const includeFull = searchParams.get('full') === 'true'
     const limit = Math.min(parseInt(searchParams.get('limit') || '10'), 20)
+    const fields = parseFields(searchParams)
 
     if (!userId) {
         return NextResponse.json({ error: 'Missing user_id parameter' }, { status: 400 })
@@ -108,7 +110,7 @@ export async function GET(request: NextRequest) {
         })
 
         return NextResponse.json({
-            messages: formattedMessages,
+            messages: projectFields(formattedMessages, fields),
             connected: true
         })
     } catch (err) {
@@ -1,13 +1,26 @@
 import { createClient } from '@/lib/supabase/server'
 import { NextRequest, NextResponse } from 'next/server'
 import { getValidGoogleToken } from '@/lib/google-auth'
+import { parseFields, projectFields } from '@/lib/field-projection'
+
+// Upper bounds for agent-supplied windows and result counts
+const MAX_WINDOW_DAYS = 31
+const MAX_RESULTS_CAP = 50
+
+// Only the event fields formatted below (partial response keeps Google payloads small)
+const EVENT_FIELDS = 'nextPageToken,items(id,summary,description,location,start)'
 
 export async function GET(request: NextRequest) {
     const supabase = await createClient()
 
-    // Get timeframe from query params
+    // Window: explicit start/end (ISO), or days ahead, or a named timeframe
     const { searchParams } = new URL(request.url)
     const timeframe = searchParams.get('timeframe') || 'week'
+    const startParam = searchParams.get('start')
+    const endParam = searchParams.get('end')
+    const daysParam = searchParams.get('days')
+    const limitParam = searchParams.get('limit')
+    const fields = parseFields(searchParams)
 
     // Get user - either from session cookie OR from X-User-ID header (for agent)
     let userId: string | null = null
@@ -35,13 +48,31 @@ export async function GET(request: NextRequest) {
     }
 
     try {
-        // Calculate time range based on timeframe
+        // Calculate time range: start/end > days > timeframe
         const now = new Date()
         let timeMin = now.toISOString()
         let timeMax: string
         let maxResults = 10
 
-        if (timeframe === 'today') {
+        if (startParam || endParam) {
+            const start = startParam ? new Date(startParam) : now
+            const end = endParam ? new Date(endParam) : null
+            if (isNaN(start.getTime()) || !end || isNaN(end.getTime()) || end <= start) {
+                return NextResponse.json({
+                    error: 'Invalid window. Use ISO 8601 start/end with end after start.',
+                    received: { start: startParam, end: endParam }
+                }, { status: 400 })
+            }
+            timeMin = start.toISOString()
+            timeMax = end.toISOString()
+        } else if (daysParam) {
+            // days=1 is the rest of today, days=2 runs through end of tomorrow, ...
+            const days = Math.min(Math.max(parseInt(daysParam, 10) || 1, 1), MAX_WINDOW_DAYS)
+            const endOfWindow = new Date(now)
+            endOfWindow.setDate(endOfWindow.getDate() + days - 1)
+            endOfWindow.setHours(23, 59, 59, 999)
+            timeMax = endOfWindow.toISOString()
+        } else if (timeframe === 'today') {
             const endOfDay = new Date(now)
             endOfDay.setHours(23, 59, 59, 999)
             timeMax = endOfDay.toISOString()
@@ -54,13 +85,18 @@ export async function GET(request: NextRequest) {
             timeMax = nextWeek.toISOString()
         }
 
+        if (limitParam) {
+            maxResults = Math.min(Math.max(parseInt(limitParam, 10) || maxResults, 1), MAX_RESULTS_CAP)
+        }
+
         const response = await fetch(
             `https://www.googleapis.com/calendar/v3/calendars/primary/events?` +
             `timeMin=${timeMin}&` +
             `timeMax=${timeMax}&` +
             `singleEvents=true&` +
             `orderBy=startTime&` +
-            `maxResults=${maxResults}`,
+            `maxResults=${maxResults}&` +
+            `fields=${encodeURIComponent(EVENT_FIELDS)}`,
             {
                 headers: {
                     Authorization: `Bearer ${providerToken}`,
@@ -88,7 +124,7 @@ export async function GET(request: NextRequest) {
         const data = await response.json()
 
         // Format for UI
-        const events = data.items?.map((item: any) => ({
+        const events = (data.items || []).map((item: any) => ({
             id: item.id,
             title: item.summary || 'Untitled Event',
             time: item.start?.dateTime
@@ -112,10 +148,12 @@ export async function GET(request: NextRequest) {
             start: item.start?.dateTime || item.start?.date,
             location: item.location || null,
             isToday: isToday(item.start?.dateTime || item.start?.date),
-        })) || []
+        }))
 
         return NextResponse.json({
-            events,
+            events: projectFields(events, fields),
+            window: { start: timeMin, end: timeMax },
+            truncated: Boolean(data.nextPageToken),
             connected: true
         })
     } catch (err) {
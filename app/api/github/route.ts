@@ -1,12 +1,14 @@
 import { createClient } from '@/lib/supabase/server'
 import { NextRequest, NextResponse } from 'next/server'
 import { getValidGithubToken } from '@/lib/github-auth'
+import { parseFields, projectFields } from '@/lib/field-projection'
 
 export async function GET(request: NextRequest) {
     const searchParams = request.nextUrl.searchParams
     const action = searchParams.get('action') || 'repos'
     const owner = searchParams.get('owner')
     const repo = searchParams.get('repo')
+    const fields = parseFields(searchParams)
 
     // Get user - either from session cookie OR from X-User-ID header (for agent)
     const supabase = await createClient()
@@ -46,6 +48,8 @@ export async function GET(request: NextRequest) {
 
         const repoParam = searchParams.get('repo')
         const days = parseInt(searchParams.get('days') || '1')
+        // Incremental sync: only activity after this ISO timestamp
+        const sinceParam = searchParams.get('since')
 
         try {
             // Get user info to find repos
@@ -91,8 +95,11 @@ export async function GET(request: NextRequest) {
             }
 
             // Calculate date threshold
-            const sinceDate = new Date()
+            let sinceDate = new Date()
             sinceDate.setDate(sinceDate.getDate() - days)
+            if (sinceParam && !isNaN(new Date(sinceParam).getTime())) {
+                sinceDate = new Date(sinceParam)
+            }
             const sinceISO = sinceDate.toISOString()
 
             // Fetch events from each repo
@@ -108,6 +115,7 @@ export async function GET(request: NextRequest) {
                     const commits = await commitsResponse.json()
                     for (const commit of commits) {
                         allEvents.push({
+                            id: `${fullName}@${commit.sha}`,
                             event_type: 'commit',
                             actor: commit.commit?.author?.name || commit.author?.login || 'Unknown',
                             title: commit.commit?.message?.split('\n')[0] || 'No message',
@@ -127,6 +135,7 @@ export async function GET(request: NextRequest) {
                     for (const pr of prs) {
                         if (new Date(pr.created_at) > sinceDate) {
                             allEvents.push({
+                                id: `${fullName}#${pr.number}`,
                                 event_type: 'pull_request',
                                 actor: pr.user?.login || 'Unknown',
                                 title: pr.title,
@@ -143,7 +152,7 @@ export async function GET(request: NextRequest) {
             allEvents.sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime())
 
             return NextResponse.json({
-                events: allEvents.slice(0, 20),
+                events: projectFields(allEvents.slice(0, 20), fields),
                 connected: true
             })
 
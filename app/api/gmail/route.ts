@@ -1,6 +1,8 @@
 import { createClient } from '@/lib/supabase/server'
 import { NextRequest, NextResponse } from 'next/server'
 import { getValidGoogleToken } from '@/lib/google-auth'
+import { parseFields, projectFields } from '@/lib/field-projection'
+import { GmailApiError, batchGetMessages, getMessageMetadata, sortNewestFirst, syncInbox } from '@/lib/gmail-sync'
 
 export async function GET(request: NextRequest) {
     const supabase = await createClient()
@@ -9,6 +11,7 @@ export async function GET(request: NextRequest) {
     const { searchParams } = new URL(request.url)
     const includeFull = searchParams.get('full') === 'true'
     const limit = Math.min(parseInt(searchParams.get('limit') || '10'), 20)
+    const fields = parseFields(searchParams)
 
     // Get user - either from session cookie OR from X-User-ID header (for agent)
     let userId: string | null = null
@@ -36,44 +39,16 @@ export async function GET(request: NextRequest) {
     }
 
     try {
-        // Fetch messages from Gmail API
-        const response = await fetch(
-            'https://gmail.googleapis.com/gmail/v1/users/me/messages?maxResults=20&labelIds=INBOX',
-            {
-                headers: {
-                    Authorization: `Bearer ${accessToken}`,
-                },
-            }
-        )
-
-        if (!response.ok) {
-            const errorData = await response.json()
-            return NextResponse.json({
-                error: 'Gmail API error',
-                details: errorData
-            }, { status: response.status })
-        }
+        // INBOX ids: one history call since the last check (a full list the first time)
+        const { ids, mode } = await syncInbox(userId, accessToken, {
+            forceFull: searchParams.get('refresh') === 'true'
+        })
+        const wanted = ids.slice(0, limit)
 
-        const data = await response.json()
-        const messageIds = data.messages || []
-
-        // Fetch details for each message (in parallel)
-        const format = includeFull ? 'full' : 'metadata'
-        const metadataHeaders = includeFull ? '' : '&metadataHeaders=From&metadataHeaders=Subject&metadataHeaders=Date'
-
-        const messageDetails = await Promise.all(
-            messageIds.slice(0, limit).map(async (msg: any) => {
-                const detailResponse = await fetch(
-                    `https://gmail.googleapis.com/gmail/v1/users/me/messages/${msg.id}?format=${format}${metadataHeaders}`,
-                    {
-                        headers: {
-                            Authorization: `Bearer ${accessToken}`,
-                        },
-                    }
-                )
-                return detailResponse.json()
-            })
-        )
+        // Details for the wanted messages: cached metadata, the rest in one batch request
+        const messageDetails = sortNewestFirst(includeFull
+            ? await batchGetMessages(accessToken, wanted, 'format=full')
+            : await getMessageMetadata(userId, accessToken, wanted))
 
         // Format messages for UI
         const formattedMessages = messageDetails.map((msg: any) => {
@@ -112,18 +87,35 @@ export async function GET(request: NextRequest) {
 
         // Also create events format for voice agent
         const events = formattedMessages.map((msg: any) => ({
+            id: msg.id,
             actor: msg.from,
+            email: msg.email,
             title: msg.subject,
             date: msg.date,
             unread: msg.unread,
         }))
 
+        // Projected responses are for the voice agent: events only
+        if (fields) {
+            return NextResponse.json({
+                events: projectFields(events, fields),
+                connected: true
+            })
+        }
+
         return NextResponse.json({
             messages: formattedMessages,
             events,  // For voice agent compatibility
-            connected: true
+            connected: true,
+            sync: mode
         })
     } catch (err) {
+        if (err instanceof GmailApiError) {
+            return NextResponse.json({
+                error: 'Gmail API error',
+                details: err.details
+            }, { status: err.status })
+        }
         console.error('Gmail Fetch Error:', err)
         return NextResponse.json({ error: 'Internal Server Error' }, { status: 500 })
     }
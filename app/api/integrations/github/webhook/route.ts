@@ -7,6 +7,10 @@ import { NextRequest, NextResponse } from 'next/server'
 import crypto from 'crypto'
 import { createClient } from '@/lib/supabase/server'
 
+// Voice agent ingest endpoint for its local activity store (optional)
+const ACTIVITY_INGEST_URL = process.env.ACTIVITY_INGEST_URL
+const ACTIVITY_INGEST_SECRET = process.env.ACTIVITY_INGEST_SECRET
+
 export async function POST(req: NextRequest) {
     try {
         const signature = req.headers.get('x-hub-signature-256')
@@ -38,6 +42,8 @@ export async function POST(req: NextRequest) {
             occurred_at: new Date().toISOString(),
         })
 
+        await forwardToAgent(event, payload)
+
         return NextResponse.json({ ok: true })
     } catch (error) {
         console.error('GitHub webhook error:', error)
@@ -78,3 +84,55 @@ function getEventUrl(event: string | null, payload: Record<string, unknown>): st
             return null
     }
 }
+
+/**
+ * Normalize push/pull_request deliveries into the same event shape (and ids)
+ * that /api/github?action=events returns, and push them to the agent's store.
+ * Failures are logged only - the agent falls back to syncing.
+ */
+async function forwardToAgent(event: string | null, payload: any): Promise<void> {
+    if (!ACTIVITY_INGEST_URL) return
+
+    const repo: string | undefined = payload.repository?.full_name
+    if (!repo) return
+
+    const events: any[] = []
+    if (event === 'push') {
+        for (const commit of payload.commits || []) {
+            events.push({
+                id: `${repo}@${commit.id}`,
+                event_type: 'commit',
+                actor: commit.author?.name || commit.author?.username || 'Unknown',
+                title: commit.message?.split('\n')[0] || 'No message',
+                date: commit.timestamp,
+                repo,
+            })
+        }
+    } else if (event === 'pull_request' && payload.pull_request) {
+        const pr = payload.pull_request
+        events.push({
+            id: `${repo}#${pr.number}`,
+            event_type: 'pull_request',
+            actor: pr.user?.login || 'Unknown',
+            title: pr.title,
+            date: pr.created_at,
+            state: pr.state,
+            repo,
+        })
+    }
+    if (events.length === 0) return
+
+    try {
+        await fetch(ACTIVITY_INGEST_URL, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                ...(ACTIVITY_INGEST_SECRET ? { 'X-Agent-Secret': ACTIVITY_INGEST_SECRET } : {}),
+            },
+            body: JSON.stringify({ repo, events }),
+            signal: AbortSignal.timeout(2000),
+        })
+    } catch (error) {
+        console.error('Agent ingest forward failed:', error)
+    }
+}
@@ -0,0 +1,36 @@
+/**
+ * Field Projection for Agent Responses
+ * `?fields=actor,title,date` trims list items to the named keys so the
+ * voice agent only downloads and decodes what it actually reads.
+ */
+
+/**
+ * Parse the `fields` query param into a list of keys, or null if absent
+ */
+export function parseFields(searchParams: URLSearchParams): string[] | null {
+    const raw = searchParams.get('fields')
+    if (!raw) return null
+
+    const fields = raw.split(',').map(f => f.trim()).filter(Boolean)
+    return fields.length > 0 ? fields : null
+}
+
+/**
+ * Keep only the requested keys of each item (missing/undefined keys are dropped)
+ */
+export function projectFields<T extends Record<string, any>>(
+    items: T[],
+    fields: string[] | null
+): Partial<T>[] {
+    if (!fields) return items
+
+    return items.map(item => {
+        const projected: Record<string, any> = {}
+        for (const field of fields) {
+            if (item[field] !== undefined) {
+                projected[field] = item[field]
+            }
+        }
+        return projected as Partial<T>
+    })
+}
@@ -0,0 +1,243 @@
+/**
+ * Incremental Gmail Sync
+ * Keeps each user's recent INBOX message ids and a metadata cache in memory.
+ * After one full list, a check is a single users.history.list call from the
+ * stored historyId; label changes are applied from the history itself, and
+ * only messages we have never seen are fetched - together, in one batch request.
+ */
+
+const GMAIL_API = 'https://gmail.googleapis.com/gmail/v1'
+const GMAIL_BATCH = 'https://gmail.googleapis.com/batch/gmail/v1'
+
+// Newest INBOX messages tracked per user (the route serves at most 20)
+const INBOX_WINDOW = 20
+// Relist from scratch now and then, so deletions can't shrink the window for good
+const FULL_SYNC_INTERVAL_MS = 30 * 60 * 1000
+// History pages read before giving up and relisting
+const MAX_HISTORY_PAGES = 5
+// Cached message metadata across all users (oldest evicted first)
+const MAX_CACHED_MESSAGES = 2000
+
+const METADATA_QUERY = 'format=metadata&metadataHeaders=From&metadataHeaders=Subject&metadataHeaders=Date'
+
+export interface GmailMessage {
+    id: string
+    threadId?: string
+    labelIds?: string[]
+    snippet?: string
+    internalDate?: string
+    payload?: any
+}
+
+interface InboxState {
+    historyId: string
+    ids: string[]  // newest first
+    fullSyncAt: number
+}
+
+export class GmailApiError extends Error {
+    constructor(public status: number, public details: any) {
+        super(`Gmail API error ${status}`)
+    }
+}
+
+const inboxStates = new Map<string, InboxState>()
+const metadataCache = new Map<string, GmailMessage>()
+
+function cacheKey(userId: string, messageId: string): string {
+    return `${userId}:${messageId}`
+}
+
+function cacheMessage(userId: string, message: GmailMessage) {
+    const key = cacheKey(userId, message.id)
+    metadataCache.delete(key)
+    metadataCache.set(key, message)
+    while (metadataCache.size > MAX_CACHED_MESSAGES) {
+        metadataCache.delete(metadataCache.keys().next().value as string)
+    }
+}
+
+async function gmailGet(accessToken: string, path: string): Promise<any> {
+    const response = await fetch(`${GMAIL_API}${path}`, {
+        headers: { Authorization: `Bearer ${accessToken}` },
+    })
+    if (!response.ok) {
+        throw new GmailApiError(response.status, await response.json().catch(() => null))
+    }
+    return response.json()
+}
+
+/**
+ * List the newest INBOX messages, anchored to the mailbox's current historyId,
+ * and drop the user's cached metadata so it is refetched with current labels
+ */
+async function fullSync(userId: string, accessToken: string): Promise<InboxState> {
+    // Read the historyId first: changes landing during the list replay next time
+    const profile = await gmailGet(accessToken, '/users/me/profile')
+    const list = await gmailGet(accessToken, `/users/me/messages?maxResults=${INBOX_WINDOW}&labelIds=INBOX`)
+
+    // Label changes since the last history sync are unknown, so cached
+    // metadata (unread, labels) can't be trusted past this point
+    const prefix = cacheKey(userId, '')
+    for (const key of Array.from(metadataCache.keys())) {
+        if (key.startsWith(prefix)) metadataCache.delete(key)
+    }
+
+    const state: InboxState = {
+        historyId: profile.historyId,
+        ids: (list.messages || []).map((m: GmailMessage) => m.id),
+        fullSyncAt: Date.now(),
+    }
+    inboxStates.set(userId, state)
+    return state
+}
+
+/**
+ * Apply users.history.list changes since the stored historyId. Returns false
+ * if the history is gone (too old) or too long, and a full list is needed.
+ */
+async function applyHistory(userId: string, accessToken: string, state: InboxState): Promise<boolean> {
+    const ids = [...state.ids]
+    let historyId = state.historyId
+    let pageToken: string | undefined
+
+    for (let page = 0; page < MAX_HISTORY_PAGES; page++) {
+        let data: any
+        try {
+            data = await gmailGet(
+                accessToken,
+                `/users/me/history?startHistoryId=${state.historyId}` +
+                '&historyTypes=messageAdded&historyTypes=messageDeleted' +
+                '&historyTypes=labelAdded&historyTypes=labelRemoved' +
+                (pageToken ? `&pageToken=${pageToken}` : '')
+            )
+        } catch (err) {
+            // 404: startHistoryId is older than Gmail keeps
+            if (err instanceof GmailApiError && err.status === 404) return false
+            throw err
+        }
+
+        for (const record of data.history || []) {
+            for (const { message } of record.messagesAdded || []) {
+                if (message.labelIds?.includes('INBOX') && !ids.includes(message.id)) {
+                    ids.unshift(message.id)
+                }
+            }
+            for (const { message } of record.messagesDeleted || []) {
+                const index = ids.indexOf(message.id)
+                if (index !== -1) ids.splice(index, 1)
+                metadataCache.delete(cacheKey(userId, message.id))
+            }
+            for (const change of [...(record.labelsAdded || []), ...(record.labelsRemoved || [])]) {
+                const message: GmailMessage = change.message
+                // History carries the message's labels after the change (read, archived, ...)
+                const cached = metadataCache.get(cacheKey(userId, message.id))
+                if (cached) cached.labelIds = message.labelIds
+                const inInbox = message.labelIds?.includes('INBOX')
+                const index = ids.indexOf(message.id)
+                if (inInbox && index === -1) ids.unshift(message.id)
+                if (!inInbox && index !== -1) ids.splice(index, 1)
+            }
+        }
+
+        historyId = data.historyId || historyId
+        pageToken = data.nextPageToken
+        if (!pageToken) {
+            state.ids = ids.slice(0, INBOX_WINDOW)
+            state.historyId = historyId
+            return true
+        }
+    }
+    return false
+}
+
+/**
+ * Bring a user's INBOX ids up to date: one history call when we have synced
+ * before, a full list the first time (or when history can't be used).
+ */
+export async function syncInbox(
+    userId: string,
+    accessToken: string,
+    options: { forceFull?: boolean } = {}
+): Promise<{ ids: string[], mode: 'full' | 'incremental' }> {
+    const state = inboxStates.get(userId)
+    const stale = !state || Date.now() - state.fullSyncAt > FULL_SYNC_INTERVAL_MS
+
+    if (state && !stale && !options.forceFull && await applyHistory(userId, accessToken, state)) {
+        return { ids: state.ids, mode: 'incremental' }
+    }
+    const fresh = await fullSync(userId, accessToken)
+    return { ids: fresh.ids, mode: 'full' }
+}
+
+/**
+ * Fetch several messages in one multipart batch request
+ */
+export async function batchGetMessages(accessToken: string, ids: string[], query: string): Promise<GmailMessage[]> {
+    if (ids.length === 0) return []
+
+    const boundary = `otto_batch_${Date.now()}`
+    const body = ids.map((id, i) =>
+        `--${boundary}\r\n` +
+        'Content-Type: application/http\r\n' +
+        `Content-ID: <item-${i}>\r\n\r\n` +
+        `GET /gmail/v1/users/me/messages/${id}?${query}\r\n\r\n`
+    ).join('') + `--${boundary}--`
+
+    const response = await fetch(GMAIL_BATCH, {
+        method: 'POST',
+        headers: {
+            Authorization: `Bearer ${accessToken}`,
+            'Content-Type': `multipart/mixed; boundary=${boundary}`,
+        },
+        body,
+    })
+    if (!response.ok) {
+        throw new GmailApiError(response.status, await response.text())
+    }
+
+    const responseBoundary = response.headers.get('content-type')?.match(/boundary=([^;]+)/)?.[1]
+    if (!responseBoundary) {
+        throw new GmailApiError(502, 'Batch response without a boundary')
+    }
+    return parseBatchResponse(await response.text(), responseBoundary)
+}
+
+function parseBatchResponse(text: string, boundary: string): GmailMessage[] {
+    const messages: GmailMessage[] = []
+    for (const part of text.split(`--${boundary}`)) {
+        // Each part wraps a full HTTP response; keep the 200s
+        const status = part.match(/HTTP\/[\d.]+ (\d{3})/)?.[1]
+        const start = part.indexOf('{')
+        const end = part.lastIndexOf('}')
+        if (status !== '200' || start === -1 || end < start) continue
+        try {
+            messages.push(JSON.parse(part.slice(start, end + 1)))
+        } catch {
+            // Skip a malformed part rather than failing the whole check
+        }
+    }
+    return messages
+}
+
+/**
+ * Metadata (From/Subject/Date, labels, snippet) for the given ids, in order:
+ * cached messages are reused, the rest come from one batch request
+ */
+export async function getMessageMetadata(userId: string, accessToken: string, ids: string[]): Promise<GmailMessage[]> {
+    const missing = ids.filter(id => !metadataCache.has(cacheKey(userId, id)))
+    if (missing.length > 0) {
+        const fetched = await batchGetMessages(accessToken, missing, METADATA_QUERY)
+        for (const message of fetched) cacheMessage(userId, message)
+    }
+    return ids
+        .map(id => metadataCache.get(cacheKey(userId, id)))
+        .filter((message): message is GmailMessage => Boolean(message))
+}
+
+/**
+ * Newest first, since incremental additions arrive out of list order
+ */
+export function sortNewestFirst(messages: GmailMessage[]): GmailMessage[] {
+    return [...messages].sort((a, b) => parseInt(b.internalDate || '0') - parseInt(a.internalDate || '0'))
+}